@@ -35,7 +35,7 @@ from tui.navigation import (
     menu_automation_integration,
     menu_service_config,
 )
-from tui.routing import get_default_model, get_fallbacks
+from tui.routing import get_model_status
 
 
 def _safe_pause_after_error():
@@ -100,8 +100,8 @@ def _build_main_layout() -> Layout:
     menu_table.add_row("[0]", "👋  退出")
     layout["menu"].update(Panel(menu_table, border_style="blue", box=box.ROUNDED, title="操作菜单"))
 
-    default_model = get_default_model() or "(未设置)"
-    fallbacks = get_fallbacks()
+    default_model, fallbacks = get_model_status()
+    default_model = default_model or "(未设置)"
     fallback_text = " -> ".join(fallbacks[:3]) if fallbacks else "(未设置)"
     if len(fallbacks) > 3:
         fallback_text += " -> ..."
@@ -123,6 +123,14 @@ def _normalize_permission_override_record(value: Any) -> Optional[Dict[str, Any]
     return out if out else None
 
 
+# Agent 元数据写入计数，供调用方判断派生缓存是否过期
+_AGENT_META_STATE = {"generation": 0}
+
+
+def agent_meta_generation() -> int:
+    return _AGENT_META_STATE["generation"]
+
+
 def _load_agent_meta_store() -> Dict[str, Any]:
     path = _agent_meta_store_path()
     try:
@@ -148,6 +156,7 @@ def _save_agent_meta_store(data: Dict[str, Any]) -> bool:
             os.makedirs(parent, exist_ok=True)
         with open(path, "w", encoding="utf-8") as f:
             json.dump(data if isinstance(data, dict) else {"agents": {}}, f, indent=2)
+        _AGENT_META_STATE["generation"] += 1
         return True
     except Exception:
         return False
@@ -394,15 +403,30 @@ class OpenClawConfig:
     def __init__(self, path: str = DEFAULT_CONFIG_PATH):
         self.path = path
         self.data: dict = {}
+        # 每次重新加载递增，供调用方判断基于 data 的派生缓存是否过期
+        self.generation = 0
+        self._signature: Optional[tuple] = None
+        # 最近一次备份：(源文件签名, 备份路径)；源文件未变化时复用，不再重复复制
+        self._last_backup: Optional[tuple] = None
         self._load()
 
     def _is_dry_run(self) -> bool:
         return os.environ.get("EASYCLAW_DRY_RUN", "0") == "1"
     
+    def _file_signature(self) -> Optional[tuple]:
+        """单次 stat 同时回答“是否存在”与“是否变化”：(mtime_ns, size)，不存在返回 None"""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
     def _load(self):
         """加载配置"""
+        self.generation += 1
+        self._signature = self._file_signature()
         try:
-            if os.path.exists(self.path):
+            if self._signature is not None:
                 with open(self.path, 'r', encoding="utf-8") as f:
                     self.data = json.load(f)
         except Exception as e:
@@ -412,9 +436,18 @@ class OpenClawConfig:
     def reload(self):
         """重新加载配置"""
         self._load()
+
+    def reload_if_changed(self) -> bool:
+        """配置文件 (mtime, size) 变化时才重新加载，返回是否实际加载"""
+        if self._file_signature() == self._signature:
+            return False
+        self._load()
+        return True
     
     def save(self) -> bool:
         """保存配置（自动备份）"""
+        # data 可能已被原地修改，基于 data 的派生缓存一律视为过期
+        self.generation += 1
         try:
             if self._is_dry_run():
                 return True
@@ -448,13 +481,23 @@ class OpenClawConfig:
         if not os.path.exists(DEFAULT_BACKUP_DIR):
             os.makedirs(DEFAULT_BACKUP_DIR, exist_ok=True)
         
+        signature = self._file_signature()
+        if signature is None:
+            return None
+        if self._last_backup is not None:
+            last_signature, last_path = self._last_backup
+            if last_signature == signature and os.path.isfile(last_path):
+                return last_path
+
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         backup_path = f"{DEFAULT_BACKUP_DIR}/clawpanel_{timestamp}.json.bak"
-        
-        if os.path.exists(self.path):
-            subprocess.run(["cp", self.path, backup_path], check=False)
-            return backup_path
-        return None
+        # 进程内复制（Linux 下 copyfile 走 sendfile 零拷贝），省去每次备份 fork 一个 cp
+        try:
+            shutil.copyfile(self.path, backup_path)
+        except OSError:
+            return None
+        self._last_backup = (signature, backup_path)
+        return backup_path
     
     def get(self, key: str, default: Any = None) -> Any:
         """获取配置值"""
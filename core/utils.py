@@ -1,10 +1,164 @@
 """
 提供与控制台交互和公共异常包装相关的基础函数
 """
-from rich.console import Console
+import io
+import sys
+from contextlib import contextmanager
+from typing import Optional
+from rich import box
+from rich.console import Console, Group
+from rich.panel import Panel
+from rich.text import Text
 
 console = Console()
 
+STDOUT_BUFFER_SIZE = 16384
+# 进程内共用的大缓冲 stdout，首次调用 buffered_stdout() 时创建
+_BUFFERED_STDOUT = {"stream": None}
+
+
+def buffered_stdout(buffer_size: int = STDOUT_BUFFER_SIZE):
+    """返回带大缓冲区的 stdout 文本流，并用它替换 sys.stdout（全进程只创建一次）
+
+    Rich Console、Prompt、print() 与 sys.stdout.write 都经同一个缓冲区按序写出，
+    不会因多个写入者各自缓冲而乱序。行缓冲设置沿用原 sys.stdout（终端下为行缓冲）；
+    Rich 每次 print 只调用一次 write，因此一屏内容只产生一次系统调用。
+    stdout 无文件描述符（如被重定向到内存流）时回退为原始 sys.stdout。
+    """
+    if _BUFFERED_STDOUT["stream"] is not None:
+        return _BUFFERED_STDOUT["stream"]
+    try:
+        fd = sys.stdout.fileno()
+    except (AttributeError, ValueError, io.UnsupportedOperation):
+        return sys.stdout
+    # 先写出原 stdout 中尚未落地的内容，再切换写入者
+    sys.stdout.flush()
+    raw = io.open(fd, "wb", buffering=buffer_size, closefd=False)
+    stream = io.TextIOWrapper(
+        raw,
+        encoding=getattr(sys.stdout, "encoding", None) or "utf-8",
+        errors=getattr(sys.stdout, "errors", None) or "strict",
+        line_buffering=bool(getattr(sys.stdout, "line_buffering", False)),
+        write_through=False,
+    )
+    sys.stdout = stream
+    _BUFFERED_STDOUT["stream"] = stream
+    return stream
+
+def static_text(*lines: str) -> Text:
+    """预先完成 markup 解析的多行静态文本（与逐行 console.print 效果一致），供菜单在导入时构建"""
+    return Text("\n").join(console.render_str(line) for line in lines)
+
+
+def title_panel(title: str) -> Panel:
+    """菜单标题面板（双线边框，居中）"""
+    return Panel(Text(title, style="bold cyan", justify="center"), box=box.DOUBLE)
+
+
+@contextmanager
+def staged_output(target: Console):
+    """在内存中暂存整屏渲染结果，退出时一次性写入终端（避免逐行输出与重绘闪烁）"""
+    with target.capture() as capture:
+        yield target
+    target.file.write(capture.get())
+    target.file.flush()
+
+
+def render_screen(target: Console, *renderables, clear: bool = False):
+    """将整屏内容合并为一次 print 输出；clear=True 时清屏序列随同一次写入"""
+    with staged_output(target) as c:
+        if clear:
+            c.clear()
+        c.print(Group(*renderables))
+
+
+# 终端备用屏幕只有一块，同一时刻只能由一层菜单占用
+_ALT_SCREEN = {"active": False}
+# 帧下方为提示行、输入及 Prompt 的错误提示预留的行数；帧加上这些行仍在一屏内时才能按行号定位
+_PROMPT_ROWS = 4
+
+
+class MenuFrame:
+    """记录终端上当前完整显示的菜单帧，重绘时只改写变化的行（内容未变则不重绘）
+
+    选择菜单项之后的输出（子菜单、提示、结果）放进 away()，在终端备用屏幕中进行；
+    返回后主屏幕上的菜单原样恢复，下一帧只需改写变化的行并清掉旧的提示行。
+    非终端输出、帧高接近一屏、或备用屏幕已被外层菜单占用时，退回整屏重绘。
+    """
+
+    def __init__(self, target: Console):
+        self._console = target
+        self._shown: Optional[str] = None
+        self._rows = 0
+        self._size = None
+
+    def draw(self, *renderables):
+        with self._console.capture() as capture:
+            self._console.print(Group(*renderables))
+        self.draw_ansi(capture.get())
+
+    def draw_ansi(self, frame: str):
+        """绘制已渲染为 ANSI 文本的一帧
+
+        屏幕上仍是上一帧且行数相同时，只改写内容变化的行并清除旧的提示行；否则清屏后一次写入。
+        """
+        target = self._console
+        rows = frame.count("\n")
+        if self._shown is not None and rows == self._rows and self._addressable():
+            changed = "".join(
+                f"\x1b[{row};1H\x1b[2K{line}"
+                for row, (line, old) in enumerate(zip(frame.split("\n"), self._shown.split("\n")), 1)
+                if line != old
+            )
+            self._shown = frame
+            target.file.write(changed)
+            self.retry_prompt()
+            return
+        with target.capture() as capture:
+            target.clear()
+        target.file.write(capture.get() + frame)
+        target.file.flush()
+        self._rows = rows
+        self._size = target.size
+        self._shown = frame if self._addressable() else None
+
+    def _addressable(self) -> bool:
+        """屏幕可按行号定位：终端尺寸未变（窗口缩放会让旧内容重排），且帧与提示行在一屏内"""
+        target = self._console
+        size = target.size
+        return target.is_terminal and size == self._size and self._rows + _PROMPT_ROWS <= size.height
+
+    def retry_prompt(self):
+        """光标移回帧下方的提示行，清除旧的输入与错误提示（菜单本身不重绘）"""
+        if self._shown is None:
+            return
+        self._console.file.write(f"\x1b[{self._rows + 1};1H\x1b[J")
+        self._console.file.flush()
+
+    @contextmanager
+    def away(self, keep_menu: bool = True):
+        """在终端备用屏幕中执行菜单动作，结束后切回主屏幕（菜单与光标随之恢复）
+
+        keep_menu=True 时先把当前菜单复制到备用屏幕，供在菜单下方直接提示/输出的动作使用；
+        动作一开始就清屏（如进入子菜单）时传 False。
+        """
+        target = self._console
+        if self._shown is None or _ALT_SCREEN["active"]:
+            # 动作输出会覆盖屏幕上的菜单，下一帧需整屏重绘
+            self._shown = None
+            yield
+            return
+        _ALT_SCREEN["active"] = True
+        target.file.write("\x1b[?1049h\x1b[H" + (self._shown if keep_menu else ""))
+        target.file.flush()
+        try:
+            yield
+        finally:
+            target.file.write("\x1b[?1049l")
+            target.file.flush()
+            _ALT_SCREEN["active"] = False
+
+
 def safe_input(prompt: str = "") -> str:
     """安全的捕获终端输入，避免 Ctr+C 或 EOF 错误导致程序彻底异常退出"""
     try:
@@ -1,6 +1,7 @@
 """
 网关设置 (Gateway) 模块 - 端口、绑定、认证、WebUI
 """
+import json
 from typing import Dict
 from core.utils import safe_input, pause_enter
 from rich.console import Console
@@ -252,7 +253,6 @@ def set_trusted_proxies():
         trusted = [x.strip() for x in raw.split(",") if x.strip()]
     
     # 设置
-    import json
     payload = json.dumps(trusted)
     console.print(f"\n[yellow]⏳ 正在设置信任代理: {trusted}...[/]")
     out, err, code = run_cli(["config", "set", "gateway.trustedProxies", payload, "--json"])
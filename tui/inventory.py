@@ -3,16 +3,24 @@
 优化版：和其他模块风格一致，增加删除功能、协议选择、模型管理
 """
 import os
+import functools
+import gzip
+import http.client
 import json
 import re
+import subprocess
+import sys
+import zlib
 import time
+import urllib.parse
 import urllib.request
 import urllib.error
-from typing import Any, Dict, List, Optional
+from typing import Any, Collection, Dict, List, Optional
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
 from rich.text import Text
+from rich.style import Style
 from rich.prompt import Prompt, Confirm
 from rich import box
 
@@ -152,6 +160,114 @@ def _get_plugin_provider_ids(force_refresh: bool = False) -> set:
     return provider_ids
 
 
+try:
+    import orjson as _orjson
+except ImportError:  # 可选依赖：未安装时回退标准库 json
+    _orjson = None
+
+
+def _json_loads(raw) -> Any:
+    """解析 JSON（安装了 orjson 时直接解析 bytes，跳过 decode）。"""
+    if _orjson is not None:
+        return _orjson.loads(raw)
+    if isinstance(raw, (bytes, bytearray)):
+        raw = raw.decode()
+    return json.loads(raw)
+
+
+try:
+    import requests as _requests
+except ImportError:  # 可选依赖：未安装时用 http.client 按主机保持长连接
+    _requests = None
+
+# 模型发现的 HTTP 长连接：requests.Session，或 (scheme, host, port) -> http.client 连接
+_HTTP_SESSION = {"session": None}
+_HTTP_CONNECTIONS: Dict[tuple, Any] = {}
+_HTTP_REDIRECTS = (301, 302, 303, 307, 308)
+
+
+def _http_get_json(url: str, api_key: str = "", timeout: int = 10) -> Any:
+    """GET 并解析 JSON：复用长连接（重复发现时省去 TCP/TLS 握手），并声明支持 gzip/deflate。"""
+    headers = {"Accept": "application/json", "Accept-Encoding": "gzip, deflate"}
+    if api_key:
+        headers["Authorization"] = f"Bearer {api_key}"
+    if _requests is not None:
+        session = _HTTP_SESSION["session"]
+        if session is None:
+            session = _HTTP_SESSION["session"] = _requests.Session()
+        resp = session.get(url, headers=headers, timeout=timeout)
+        resp.raise_for_status()
+        # requests 已按 Content-Encoding 解压
+        return _json_loads(resp.content)
+
+    body, encoding = _http_client_get(url, headers, timeout)
+    encoding = str(encoding or "").strip().lower()
+    if encoding == "gzip":
+        body = gzip.decompress(body)
+    elif encoding == "deflate":
+        try:
+            body = zlib.decompress(body)
+        except zlib.error:
+            body = zlib.decompress(body, -zlib.MAX_WBITS)
+    return _json_loads(body)
+
+
+def _http_client_get(url: str, headers: Dict[str, str], timeout: int, redirects: int = 5) -> tuple:
+    """用按主机缓存的 http.client 连接发 GET，返回 (body, Content-Encoding)。
+
+    配置了代理时交给 urllib（http.client 不走代理），不做连接复用。
+    """
+    parts = urllib.parse.urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError(f"不支持的 URL: {url}")
+    if scheme in urllib.request.getproxies() and not urllib.request.proxy_bypass(parts.hostname):
+        req = urllib.request.Request(url, headers=headers)
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            return resp.read(), resp.headers.get("Content-Encoding", "")
+
+    key = (scheme, parts.hostname, parts.port)
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+    for attempt in range(2):
+        conn = _HTTP_CONNECTIONS.pop(key, None)
+        reused = conn is not None
+        if conn is None:
+            conn_cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            conn = conn_cls(parts.hostname, parts.port, timeout=timeout)
+        elif conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        try:
+            conn.request("GET", path, headers=headers)
+            resp = conn.getresponse()
+            body = resp.read()
+        except ConnectionError:
+            conn.close()
+            if reused and attempt == 0:
+                # 服务端已关闭空闲连接，换新连接重试一次
+                continue
+            raise
+        except Exception:
+            conn.close()
+            raise
+        if resp.will_close:
+            conn.close()
+        else:
+            _HTTP_CONNECTIONS[key] = conn
+        break
+
+    if resp.status in _HTTP_REDIRECTS and redirects > 0 and resp.getheader("Location"):
+        target = urllib.parse.urljoin(url, resp.getheader("Location"))
+        if urllib.parse.urlsplit(target).hostname != parts.hostname:
+            # 跳转到其他主机时不携带 API Key
+            headers = {k: v for k, v in headers.items() if k != "Authorization"}
+        return _http_client_get(target, headers, timeout, redirects - 1)
+    if resp.status >= 400:
+        raise urllib.error.HTTPError(url, resp.status, resp.reason, resp.msg, None)
+    return body, resp.getheader("Content-Encoding", "")
+
+
 # 已知的 API Key 类型服务商 -> 官方 auth-choice 映射
 API_KEY_PROVIDERS = {
     "openai": "openai-api-key",
@@ -1017,14 +1133,14 @@ def _deactivate_model(key: str):
     return deactivate_model(key)
 
 
-def _model_label(key: str, model: Dict, activated: set) -> str:
+def _model_label(key: str, model: Dict, activated: Collection[str]) -> str:
     name = model.get("name") or model.get("id") or key
     tag = "✅" if key in activated else "⬜"
     return f"{tag} {name} ({key})"
 
 
 def _read_key():
-    import sys, termios, tty
+    import termios, tty
     fd = sys.stdin.fileno()
     old = termios.tcgetattr(fd)
     try:
@@ -1038,8 +1154,11 @@ def _read_key():
         termios.tcsetattr(fd, termios.TCSADRAIN, old)
 
 
-def activate_models_with_search(provider: str, all_models: List[Dict], activated: set):
-    """分页 + 搜索 + 序号选择模型（raw key 模式）"""
+def activate_models_with_search(provider: str, all_models: List[Dict], activated: Collection[str]):
+    """分页 + 搜索 + 序号选择模型（raw key 模式）
+
+    activated 只用于成员判断与遍历，可直接传入 agents.defaults.models 字典，无需先转为 set。
+    """
     if not all_models:
         console.print("\n[yellow]⚠️ 未发现可用模型[/]")
         pause_enter()
@@ -1093,10 +1212,7 @@ def activate_models_with_search(provider: str, all_models: List[Dict], activated
         cursor = max(0, min(cursor, len(page_items) - 1))
 
         console.clear()
-        console.print(Panel(
-            Text(f"📦 模型管理: {provider}", style="bold cyan", justify="center"),
-            box=box.DOUBLE
-        ))
+        console.print(_provider_header("manage_models", provider))
         console.print(f"  [dim]页 {page+1}/{total_pages} | 已选 {len(selected)} | 过滤: {keyword or '无'}[/]")
         console.print("  [dim]键: n/p 翻页 | j/k/↑/↓ 移动 | 空格切换 | / 搜索 | # 批量选择 | m 手动添加 | a 全选页 | x 清空页 | Enter 确认 | q 退出[/]")
         console.print()
@@ -1342,13 +1458,15 @@ def add_custom_provider():
     menu_provider(provider)
 
 
-def is_official_provider(provider: str) -> bool:
+def is_official_provider(provider: str, plugin_available: Optional[bool] = None) -> bool:
     """判断是否是官方支持的服务商
     规则：
     1) 若该 provider 已有 auth profile（官方授权产生），判定为官方
     2) 若 provider 在内置官方选项中，判定为官方
     3) 若 provider 存在官方 auth plugin，判定为官方
     4) 其他默认归类为自定义
+
+    plugin_available 可传入调用方已查询的 auth plugin 结果，避免重复查询。
     """
     provider = normalize_provider_name(provider)
 
@@ -1369,7 +1487,9 @@ def is_official_provider(provider: str) -> bool:
         return True
 
     # 3) 插件声明可认证，视为官方 provider
-    if provider_auth_plugin_available(provider):
+    if plugin_available is None:
+        plugin_available = provider_auth_plugin_available(provider)
+    if plugin_available:
         return True
 
     # 4) 其他都按自定义处理（包含 OpenClaw Auto 补齐出来的未知 provider）
@@ -1389,6 +1509,8 @@ def reauthorize_provider(provider: str, is_official: bool):
     ok = delete_provider(provider)
     if not ok:
         return
+    # 重新授权可能伴随插件变化，丢弃 auth plugin 缓存
+    invalidate_plugin_provider_cache()
     if is_official:
         do_official_auth(provider)
     else:
@@ -1430,8 +1552,10 @@ def menu_provider(provider: str):
         current_api_token = str(provider_cfg.get("api", "") or "").strip().lower()
         current_baseurl = provider_cfg.get("baseUrl", "(未设置)")
         
+        # auth plugin 查询每轮只做一次，官方判定与菜单布局共用结果
+        auth_plugin_available = provider_auth_plugin_available(provider)
         # 判断是否是官方服务商
-        is_official = is_official_provider(provider)
+        is_official = is_official_provider(provider, plugin_available=auth_plugin_available)
         
         if is_official:
             console.print("  [bold][green]类型: 官方服务商[/][/]")
@@ -1463,7 +1587,7 @@ def menu_provider(provider: str):
         # 判断是否已授权（有 profile 或 apiKey）
         authorized = bool(profiles.get(provider)) or bool(provider_cfg.get("apiKey"))
         is_oauth = is_oauth_provider(provider)
-        plugin_auth_available = is_official and (is_oauth or provider_auth_plugin_available(provider))
+        plugin_auth_available = is_official and (is_oauth or auth_plugin_available)
         
         if authorized:
             if is_official:
@@ -1534,8 +1658,6 @@ def menu_provider(provider: str):
         
         # 接受大小写
         choice = Prompt.ask("[bold green]>[/]", choices=choices, default="0").strip().lower()
-        while choice not in choices:
-            choice = Prompt.ask("[bold green]>[/]", choices=choices, default="0").strip().lower()
         
         if choice == "0":
             break
@@ -1604,6 +1726,26 @@ def menu_provider(provider: str):
                     _run_menu_action(lambda p=provider: configure_provider_responses_input_mode(p), f"设置 Responses 输入模式 {provider}")
 
 
+_PROVIDER_HEADER_TEMPLATES = {
+    "apikey": "🔑 设置 API Key: {provider}",
+    "baseurl": "🌐 设置 Base URL: {provider}",
+    "protocol": "🔌 设置 API 协议: {provider}",
+    "discover": "🔍 自动发现模型: {provider}",
+    "list_all": "📋 所有可用模型: {provider}",
+    "list_all_count": "📋 所有可用模型: {provider} ({count} 个)",
+    "official_models": "📦 激活官方模型: {provider}",
+    "manage_models": "📦 模型管理: {provider}",
+}
+_PROVIDER_HEADER_STYLE = Style.parse("bold cyan")
+
+
+def _provider_header(kind: str, provider: str, **fields) -> Panel:
+    """服务商子页面标题（模板与样式在模块加载时预解析，仅替换服务商名）。"""
+    title = _PROVIDER_HEADER_TEMPLATES[kind].format(provider=provider, **fields)
+    return Panel(Text(title, style=_PROVIDER_HEADER_STYLE, justify="center"), box=box.DOUBLE)
+
+
+@functools.lru_cache(maxsize=64)
 def _friendly_error_message(err: str) -> str:
     if not err:
         return "未知错误"
@@ -1623,10 +1765,17 @@ def _friendly_error_message(err: str) -> str:
     return err
 
 
+_OFFICIAL_AUTH_SEPARATOR = "-" * 80
+_OFFICIAL_AUTH_BANNER = (
+    "👉 正在唤起 OpenClaw 原生配置向导 [{provider}] ...\n\n"
+    + _OFFICIAL_AUTH_SEPARATOR
+    + "\n"
+)
+
+
 def do_official_auth(provider: str):
     """执行官方授权流程（完全脱离 Rich Console，让渡终端控制权给原生进程）"""
     provider = resolve_provider_id(provider)
-    import os
     # 彻底退出任何 TUI 状态，还回干净的终端环境
     try:
         os.system('clear')
@@ -1639,8 +1788,8 @@ def do_official_auth(provider: str):
         set_provider_apikey(provider)
         return
     
-    print(f"👉 正在唤起 OpenClaw 原生配置向导 [{provider}] ...\n")
-    print("--------------------------------------------------------------------------------")
+    sys.stdout.write(_OFFICIAL_AUTH_BANNER.format(provider=provider))
+    sys.stdout.flush()
     
     # dry-run: 不实际执行授权
     if is_dry_run():
@@ -1649,29 +1798,25 @@ def do_official_auth(provider: str):
         return
 
     try:
-        from core import OPENCLAW_BIN
-        import subprocess
-        
         # 不使用 capture_output，直接继承当前终端的 stdin/stdout/stderr
         # 这样官方的 inquirer prompt 交互、输入 API Key 都能在控制台正常画出来并获取键盘输入
         cmd = [OPENCLAW_BIN, "models", "auth", "login", "--provider", provider]
         result = subprocess.run(cmd)
         
-        print("\n--------------------------------------------------------------------------------")
         if result.returncode == 0:
-            print(f"✅ [{provider}] 官方授权/配置流程被成功登出！")
+            sys.stdout.write(f"\n{_OFFICIAL_AUTH_SEPARATOR}\n✅ [{provider}] 官方授权/配置流程被成功登出！\n")
+            sys.stdout.flush()
             
             # 由于可能写入了新的配置，建议立即重载配置对象
-            import core
-            if hasattr(core, 'config'):
-                core.config.reload()
+            config.reload()
                 
         else:
-            print(f"❌ 流程中断或执行失败 (Exit code: {result.returncode})")
+            sys.stdout.write(f"\n{_OFFICIAL_AUTH_SEPARATOR}\n❌ 流程中断或执行失败 (Exit code: {result.returncode})\n")
+            sys.stdout.flush()
             
     except Exception as e:
-        print("\n--------------------------------------------------------------------------------")
-        print(f"❌ 调用原生 CLI 失败: {e}")
+        sys.stdout.write(f"\n{_OFFICIAL_AUTH_SEPARATOR}\n❌ 调用原生 CLI 失败: {e}\n")
+        sys.stdout.flush()
     
     print()
     safe_input("按回车键返回管理面板...")
@@ -1709,10 +1854,7 @@ def set_provider_apikey(provider: str):
     """设置服务商 API Key（官方 provider 走 onboard，其他 provider 走本地配置写入）"""
     provider = resolve_provider_id(provider)
     console.clear()
-    console.print(Panel(
-        Text(f"🔑 设置 API Key: {provider}", style="bold cyan", justify="center"),
-        box=box.DOUBLE
-    ))
+    console.print(_provider_header("apikey", provider))
 
     # 获取当前遮码显示
     providers_cfg = get_models_providers_cached()
@@ -1725,7 +1867,11 @@ def set_provider_apikey(provider: str):
     console.print()
 
     new_key = Prompt.ask("[bold]请输入 API Key[/]", default=current).strip()
-    if not new_key or new_key == current:
+    if not new_key:
+        return
+    if new_key == current:
+        console.print("\n  [dim](未修改，跳过写入)[/]")
+        pause_enter()
         return
 
     # 备份
@@ -1759,10 +1905,7 @@ def set_provider_apikey(provider: str):
 def set_provider_baseurl(provider: str):
     """设置服务商 Base URL"""
     console.clear()
-    console.print(Panel(
-        Text(f"🌐 设置 Base URL: {provider}", style="bold cyan", justify="center"),
-        box=box.DOUBLE
-    ))
+    console.print(_provider_header("baseurl", provider))
     
     providers_cfg = get_models_providers_cached()
     current = providers_cfg.get(provider, {}).get("baseUrl", "")
@@ -1773,6 +1916,10 @@ def set_provider_baseurl(provider: str):
     console.print()
     
     new_url = Prompt.ask("[bold]请输入 Base URL[/]", default=current).strip()
+    if new_url == current:
+        console.print("\n  [dim](未修改，跳过写入)[/]")
+        pause_enter()
+        return
     
     # 备份
     config.reload()
@@ -1830,10 +1977,7 @@ def configure_provider_responses_input_mode(provider: str):
 def set_provider_protocol(provider: str):
     """设置服务商 API 协议"""
     console.clear()
-    console.print(Panel(
-        Text(f"🔌 设置 API 协议: {provider}", style="bold cyan", justify="center"),
-        box=box.DOUBLE
-    ))
+    console.print(_provider_header("protocol", provider))
     
     providers_cfg = get_models_providers_cached()
     current = providers_cfg.get(provider, {}).get("api", "")
@@ -1850,6 +1994,10 @@ def set_provider_protocol(provider: str):
     choices = [str(i) for i in range(1, len(API_PROTOCOLS) + 1)]
     choice = Prompt.ask("[bold green]>[/]", choices=choices, default="1")
     new_proto = API_PROTOCOLS[int(choice) - 1]
+    if new_proto == current:
+        console.print("\n  [dim](未修改，跳过写入)[/]")
+        pause_enter()
+        return
     
     # 备份
     config.reload()
@@ -1906,13 +2054,28 @@ def set_provider_protocol(provider: str):
     pause_enter()
 
 
+# 自动发现模型的默认字段（标量共享，嵌套容器在 _discovered_model_entry 中浅拷贝）
+_DISCOVERED_MODEL_TEMPLATE = {
+    "reasoning": False,
+    "input": ("text",),
+    "cost": {"input": 0, "output": 0, "cacheRead": 0, "cacheWrite": 0},
+    "contextWindow": 128000,
+    "maxTokens": 4096,
+}
+
+
+def _discovered_model_entry(model_id: str) -> Dict:
+    entry = {"id": model_id, "name": model_id}
+    entry.update(_DISCOVERED_MODEL_TEMPLATE)
+    entry["input"] = list(entry["input"])
+    entry["cost"] = dict(entry["cost"])
+    return entry
+
+
 def auto_discover_models(provider: str):
     """自动发现模型（从 baseUrl 调用 /v1/models）"""
     console.clear()
-    console.print(Panel(
-        Text(f"🔍 自动发现模型: {provider}", style="bold cyan", justify="center"),
-        box=box.DOUBLE
-    ))
+    console.print(_provider_header("discover", provider))
     
     providers_cfg = get_models_providers_cached()
     base_url = providers_cfg.get(provider, {}).get("baseUrl", "")
@@ -1932,28 +2095,15 @@ def auto_discover_models(provider: str):
     console.print(f"\n[yellow]⏳ 正在从 {models_url} 发现模型...[/]")
     
     try:
-        req = urllib.request.Request(models_url)
         # 如果有 apiKey，添加 Authorization header
         api_key = providers_cfg.get(provider, {}).get("apiKey", "")
-        if api_key:
-            req.add_header("Authorization", f"Bearer {api_key}")
-        
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            data = json.loads(resp.read().decode())
+        data = _http_get_json(models_url, api_key=api_key, timeout=10)
         
-        discovered = []
-        for m in data.get("data", []):
-            model_id = m.get("id")
-            if model_id:
-                discovered.append({
-                    "id": model_id,
-                    "name": model_id,
-                    "reasoning": False,
-                    "input": ["text"],
-                    "cost": {"input": 0, "output": 0, "cacheRead": 0, "cacheWrite": 0},
-                    "contextWindow": 128000,
-                    "maxTokens": 4096
-                })
+        discovered = [
+            _discovered_model_entry(model_id)
+            for model_id in (m.get("id") for m in data.get("data", []))
+            if model_id
+        ]
         
         if discovered:
             console.print(f"\n[green]✅ 发现 {len(discovered)} 个模型[/]")
@@ -1973,11 +2123,10 @@ def auto_discover_models(provider: str):
             else:
                 invalidate_models_providers_cache()
             
-            console.print("\n发现的模型:")
-            for m in discovered[:10]:
-                console.print(f"  - {m['id']}")
+            preview = "\n".join(f"  - {m['id']}" for m in discovered[:10])
             if len(discovered) > 10:
-                console.print(f"  ... 还有 {len(discovered) - 10} 个")
+                preview += f"\n  ... 还有 {len(discovered) - 10} 个"
+            console.print(f"\n发现的模型:\n{preview}", markup=False, highlight=False)
         else:
             console.print("\n[yellow]⚠️ 未发现模型[/]")
     
@@ -2033,25 +2182,19 @@ def add_model_manual_wizard(provider: str):
 def list_all_available_models(provider: str):
     """查看官方服务商的所有可用模型"""
     console.clear()
-    console.print(Panel(
-        Text(f"📋 所有可用模型: {provider}", style="bold cyan", justify="center"),
-        box=box.DOUBLE
-    ))
+    console.print(_provider_header("list_all", provider))
     console.print()
     console.print("[yellow]⏳ 正在获取模型列表...[/]")
     
     try:
         stdout, stderr, code = run_cli(["models", "list", "--all", "--provider", provider, "--json"])
         if code == 0 and stdout:
-            data = json.loads(stdout)
+            data = _json_loads(stdout)
             models = data.get("models", [])
             
             if models:
                 console.clear()
-                console.print(Panel(
-                    Text(f"📋 所有可用模型: {provider} ({len(models)} 个)", style="bold cyan", justify="center"),
-                    box=box.DOUBLE
-                ))
+                console.print(_provider_header("list_all_count", provider, count=len(models)))
                 
                 table = Table(box=box.SIMPLE)
                 table.add_column("可用", style="cyan", width=6)
@@ -2080,10 +2223,7 @@ def list_all_available_models(provider: str):
 def add_official_models(provider: str):
     """从官方激活模型（和官方对齐）"""
     console.clear()
-    console.print(Panel(
-        Text(f"📦 激活官方模型: {provider}", style="bold cyan", justify="center"),
-        box=box.DOUBLE
-    ))
+    console.print(_provider_header("official_models", provider))
     console.print()
     console.print("[yellow]⏳ 正在获取模型列表...[/]")
     
@@ -2097,7 +2237,7 @@ def add_official_models(provider: str):
         
         # 获取当前已激活的模型
         config.reload()
-        activated = set(config.data.get("agents", {}).get("defaults", {}).get("models", {}).keys())
+        activated = config.data.get("agents", {}).get("defaults", {}).get("models", {}) or {}
         
         activate_models_with_search(provider, all_models, activated)
     
@@ -2110,10 +2250,7 @@ def manage_models_menu(provider: str):
     """模型管理（搜索/多选激活）"""
     provider = resolve_provider_id(provider)
     console.clear()
-    console.print(Panel(
-        Text(f"📦 模型管理: {provider}", style="bold cyan", justify="center"),
-        box=box.DOUBLE
-    ))
+    console.print(_provider_header("manage_models", provider))
 
     # 官方 provider 优先走 OpenClaw 官方模型目录，避免依赖本地 providers.models/baseUrl。
     if is_official_provider(provider):
@@ -2122,7 +2259,7 @@ def manage_models_menu(provider: str):
             models = get_official_models(provider)
             if models:
                 config.reload()
-                activated = set(config.data.get("agents", {}).get("defaults", {}).get("models", {}).keys())
+                activated = config.data.get("agents", {}).get("defaults", {}).get("models", {}) or {}
                 activate_models_with_search(provider, models, activated)
                 return
             console.print("\n[yellow]⚠️ 官方目录未返回模型，回退到本地/自定义发现流程。[/]")
@@ -2165,7 +2302,7 @@ def manage_models_menu(provider: str):
     
     # 获取当前已激活的模型
     config.reload()
-    activated = set(config.data.get("agents", {}).get("defaults", {}).get("models", {}).keys())
+    activated = config.data.get("agents", {}).get("defaults", {}).get("models", {}) or {}
     
     activate_models_with_search(provider, models, activated)
 
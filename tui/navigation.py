@@ -7,7 +7,7 @@ from rich.prompt import Prompt
 from rich.text import Text
 from rich import box
 
-from core.utils import pause_enter
+from core.utils import MenuFrame, pause_enter
 from tui.inventory import menu_inventory
 from tui.routing import (
     global_model_policy_menu,
@@ -15,10 +15,7 @@ from tui.routing import (
     subagent_settings_menu,
     agent_model_policy_menu,
     spawn_model_policy_menu,
-    list_agent_model_override_details,
-    get_spawn_model_policy,
-    get_default_model,
-    get_fallbacks,
+    get_model_provider_snapshot,
 )
 from tui.gateway import menu_gateway
 from tui.system import menu_system
@@ -44,14 +41,11 @@ def _run_menu_action(action, label: str):
 
 def _get_model_provider_status():
     try:
-        default_model = get_default_model() or ""
-        fallbacks = get_fallbacks() or []
-        override_details = list_agent_model_override_details() or []
-        spawn_primary, spawn_fallbacks = get_spawn_model_policy()
+        default_model, fallbacks, override_details, spawn_primary, spawn_fallbacks = get_model_provider_snapshot()
         return {
-            "default_model": default_model,
-            "fallbacks": fallbacks,
-            "agent_override_details": override_details,
+            "default_model": default_model or "",
+            "fallbacks": fallbacks or [],
+            "agent_override_details": override_details or [],
             "spawn_primary": spawn_primary or "",
             "spawn_fallbacks": spawn_fallbacks or [],
             "error": "",
@@ -67,21 +61,42 @@ def _get_model_provider_status():
         }
 
 
-def menu_model_provider():
-    """模型与供应商管理"""
-    while True:
-        console.clear()
+def _model_provider_status_key(status: dict) -> tuple:
+    """菜单状态指纹：状态未变化时复用上一次的渲染结果。"""
+    return (
+        status["error"],
+        status["default_model"],
+        tuple(status["fallbacks"]),
+        tuple(
+            (o.get("agent_id", ""), o.get("primary", ""), tuple(o.get("fallbacks", []) or []))
+            for o in status["agent_override_details"]
+        ),
+        status["spawn_primary"],
+        tuple(status["spawn_fallbacks"]),
+    )
+
+
+_MODEL_PROVIDER_RENDER_CACHE = {"key": None, "ansi": ""}
+
+
+def _render_model_provider_screen(status: dict) -> str:
+    """渲染模型与供应商管理页面为 ANSI 文本（按状态指纹与终端宽度缓存）。"""
+    # 面板与折行按终端宽度排版，窗口缩放后需重新渲染
+    key = (console.width, _model_provider_status_key(status))
+    if _MODEL_PROVIDER_RENDER_CACHE["key"] == key:
+        return _MODEL_PROVIDER_RENDER_CACHE["ansi"]
+
+    default_model = status["default_model"]
+    fallbacks = status["fallbacks"]
+    override_details = status["agent_override_details"]
+    spawn_primary = status["spawn_primary"]
+    spawn_fallbacks = status["spawn_fallbacks"]
+    with console.capture() as capture:
         console.print(Panel(
             Text("🧩 模型与供应商管理", style="bold cyan", justify="center"),
             box=box.DOUBLE
         ))
         console.print()
-        status = _get_model_provider_status()
-        default_model = status["default_model"]
-        fallbacks = status["fallbacks"]
-        override_details = status["agent_override_details"]
-        spawn_primary = status["spawn_primary"]
-        spawn_fallbacks = status["spawn_fallbacks"]
         console.print("[bold]当前设置:[/]")
         if status["error"]:
             console.print(f"  [yellow]主模型:[/] [dim](读取失败)[/]")
@@ -121,17 +136,31 @@ def menu_model_provider():
         console.print("  [cyan]4[/] 临时指派Agent（Spawn）模型优先级（默认与全局一致）")
         console.print("  [cyan]0[/] 返回")
         console.print()
+    ansi = capture.get()
+    _MODEL_PROVIDER_RENDER_CACHE.update({"key": key, "ansi": ansi})
+    return ansi
+
+
+def menu_model_provider():
+    """模型与供应商管理"""
+    frame = MenuFrame(console)
+    while True:
+        status = _get_model_provider_status()
+        # 状态指纹未变时屏幕上仍是同一帧，只清除旧的提示行，不再清屏重绘
+        frame.draw_ansi(_render_model_provider_screen(status))
         choice = Prompt.ask("[bold green]>[/]", choices=["0", "1", "2", "3", "4"], default="0")
         if choice == "0":
             return
-        if choice == "1":
-            _run_menu_action(menu_inventory, "供应商/模型资源库")
-        elif choice == "2":
-            _run_menu_action(global_model_policy_menu, "全局模型优先级")
-        elif choice == "3":
-            _run_menu_action(agent_model_policy_menu, "Agent 模型优先级")
-        elif choice == "4":
-            _run_menu_action(spawn_model_policy_menu, "Spawn 模型优先级")
+        # 子菜单在终端备用屏幕中运行，返回后本菜单原样恢复
+        with frame.away(keep_menu=False):
+            if choice == "1":
+                _run_menu_action(menu_inventory, "供应商/模型资源库")
+            elif choice == "2":
+                _run_menu_action(global_model_policy_menu, "全局模型优先级")
+            elif choice == "3":
+                _run_menu_action(agent_model_policy_menu, "Agent 模型优先级")
+            elif choice == "4":
+                _run_menu_action(spawn_model_policy_menu, "Spawn 模型优先级")
 
 
 def menu_service_config():
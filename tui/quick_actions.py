@@ -1,8 +1,13 @@
 """快速操作模块 - EasyClaw TUI."""
 
 import os
+import re
+import signal
 import sys
 import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from typing import Optional
 
 from rich.console import Console
@@ -10,7 +15,20 @@ from rich.panel import Panel
 from rich.table import Table
 from rich import box
 
-console = Console()
+from core.utils import buffered_stdout
+
+console = Console(file=buffered_stdout())
+
+HEALTH_CHECK_TIMEOUT = 6
+LOG_VIEW_TIMEOUT = 5
+_STATUS_STYLE = {"✓": "green", "!": "yellow", "✗": "red"}
+_STATUS_CELL = {k: f"[{v}]{k}[/{v}]" for k, v in _STATUS_STYLE.items()}
+_CONFIG_PATHS = (
+    "/root/.openclaw/config.yaml",
+    "/root/.openclaw/config.yml",
+)
+_last_config_path: Optional[str] = None
+_MEMINFO_RE = re.compile(rb'^Mem(Total|Available):\s+(\d+)', re.M)
 
 
 def show():
@@ -85,13 +103,12 @@ def _start_gateway() -> str:
         result = subprocess.run(
             ["openclaw", "gateway", "start"],
             capture_output=True,
-            text=True,
             timeout=10
         )
         if result.returncode == 0:
             return "Gateway 服务已启动"
         else:
-            raise RuntimeError(result.stderr or "启动失败")
+            raise RuntimeError(result.stderr.decode("utf-8", "replace") or "启动失败")
     except subprocess.TimeoutExpired:
         return "Gateway 启动中..."
 
@@ -102,20 +119,23 @@ def _stop_gateway() -> str:
         result = subprocess.run(
             ["openclaw", "gateway", "stop"],
             capture_output=True,
-            text=True,
             timeout=10
         )
         if result.returncode == 0:
             return "Gateway 服务已停止"
         else:
-            raise RuntimeError(result.stderr or "停止失败")
+            raise RuntimeError(result.stderr.decode("utf-8", "replace") or "停止失败")
     except subprocess.TimeoutExpired:
         return "Gateway 停止中..."
 
 
 def _restart_gateway() -> str:
-    """重启 Gateway 服务."""
-    _stop_gateway()
+    """重启 Gateway 服务（stop 一返回就启动）."""
+    try:
+        _stop_gateway()
+    except RuntimeError:
+        # 服务本未运行时 stop 会失败，不应阻止随后的启动
+        pass
     return _start_gateway()
 
 
@@ -137,39 +157,75 @@ def _gateway_status() -> str:
         return "状态查询超时"
 
 
+def _stream_logs(cmd: list) -> tuple:
+    """逐行输出日志命令的结果（收到即显示），返回 (退出码, 已输出行数, 是否超时)."""
+    expired = threading.Event()
+    with subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        bufsize=1,
+        start_new_session=True,
+    ) as proc:
+        def _expire():
+            expired.set()
+            # 杀掉整个进程组：包装脚本派生的子进程也持有管道，只杀父进程读取不会结束
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+        # 超时后终止子进程，读取循环随之结束
+        timer = threading.Timer(LOG_VIEW_TIMEOUT, _expire)
+        timer.start()
+        try:
+            lines = 0
+            for line in proc.stdout:
+                if not lines:
+                    console.print("[bold cyan]最近 50 行日志:[/bold cyan]")
+                lines += 1
+                console.out(line, end="", highlight=False)
+            proc.wait()
+        finally:
+            timer.cancel()
+    return proc.returncode, lines, expired.is_set()
+
+
 def _view_logs() -> str:
     """查看日志."""
     try:
-        # 首先检查 openclaw logs 命令
-        result = subprocess.run(
-            ["openclaw", "gateway", "logs", "--tail", "50"],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        
-        if result.returncode == 0:
-            console.print("[bold cyan]最近 50 行日志:[/bold cyan]")
-            console.print(result.stdout)
-        else:
-            # 尝试 journalctl
-            result2 = subprocess.run(
-                ["journalctl", "-u", "openclaw", "-n", "50", "--no-pager"],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            if result2.returncode == 0:
-                console.print("[bold cyan]最近 50 行日志:[/bold cyan]")
-                console.print(result2.stdout)
-            else:
-                raise RuntimeError("无法获取日志")
+        # 首先检查 openclaw logs 命令；只有它失败且未输出任何内容时才尝试 journalctl，
+        # 避免两种来源的日志混在一起
+        code, lines, timed_out = _stream_logs(["openclaw", "gateway", "logs", "--tail", "50"])
+        if code != 0 and not lines:
+            if timed_out:
+                console.print(f"[yellow]openclaw 日志读取超时（{LOG_VIEW_TIMEOUT}s），改用 journalctl[/yellow]")
+            code, lines, timed_out = _stream_logs(["journalctl", "-u", "openclaw", "-n", "50", "--no-pager"])
+        if timed_out:
+            console.print(f"\n[yellow]日志读取超时（{LOG_VIEW_TIMEOUT}s），已停止读取[/yellow]")
+        elif code != 0 and not lines:
+            raise RuntimeError("无法获取日志")
         
         return "日志查看完成"
     except Exception as e:
         raise RuntimeError(f"查看日志失败: {e}")
 
 
+def _rmtree_count(path: str) -> int:
+    """删除目录内全部内容（单次遍历），返回删除的文件数."""
+    count = 0
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                count += _rmtree_count(entry.path)
+                os.rmdir(entry.path)
+            else:
+                os.unlink(entry.path)
+                count += 1
+    return count
+
+
 def _cleanup_temp() -> str:
     """清理临时文件."""
     temp_dirs = [
@@ -181,10 +237,8 @@ def _cleanup_temp() -> str:
     for temp_dir in temp_dirs:
         if os.path.exists(temp_dir):
             try:
-                import shutil
-                file_count = sum([len(files) for _, _, files in os.walk(temp_dir)])
-                shutil.rmtree(temp_dir)
-                cleaned += file_count
+                cleaned += _rmtree_count(temp_dir)
+                os.rmdir(temp_dir)
             except Exception as e:
                 console.print(f"[yellow]清理 {temp_dir} 时出错: {e}[/yellow]")
     
@@ -213,13 +267,22 @@ def _health_check() -> str:
         table.add_column("状态", style="bold")
         table.add_column("详情", style="dim")
         
-        for name, check_func in checks:
-            try:
-                status, detail = check_func()
-                color = "green" if status == "✓" else "yellow" if status == "!" else "red"
-                table.add_row(name, f"[{color}]{status}[/{color}]", detail)
-            except Exception as e:
-                table.add_row(name, "[red]✗[/red]", str(e))
+        # 各项检查相互独立，并发执行；结果按原顺序填表。
+        # 不用 with：退出时 shutdown(wait=True) 会等待卡住的检查，总耗时就不再受超时约束
+        executor = ThreadPoolExecutor(max_workers=len(checks))
+        try:
+            futures = [(name, executor.submit(check_func)) for name, check_func in checks]
+            deadline = time.monotonic() + HEALTH_CHECK_TIMEOUT
+            for name, future in futures:
+                try:
+                    status, detail = future.result(timeout=max(0.0, deadline - time.monotonic()))
+                    table.add_row(name, _STATUS_CELL.get(status, status), detail)
+                except FutureTimeoutError:
+                    table.add_row(name, _STATUS_CELL["!"], f"检查超时（>{HEALTH_CHECK_TIMEOUT}s）")
+                except Exception as e:
+                    table.add_row(name, _STATUS_CELL["✗"], str(e))
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
         
         console.print(table)
         return "健康检查完成"
@@ -233,8 +296,8 @@ def _check_gateway_running() -> tuple:
     try:
         result = subprocess.run(
             ["openclaw", "gateway", "status"],
-            capture_output=True,
-            text=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
             timeout=5
         )
         if result.returncode == 0:
@@ -246,14 +309,17 @@ def _check_gateway_running() -> tuple:
 
 def _check_config() -> tuple:
     """检查配置文件."""
+    global _last_config_path
     try:
-        config_paths = [
-            "/root/.openclaw/config.yaml",
-            "/root/.openclaw/config.yml",
-        ]
-        for path in config_paths:
-            if os.path.exists(path):
+        # 上次命中的路径优先检查，通常一次 stat 即可返回
+        candidates = _CONFIG_PATHS
+        if _last_config_path:
+            candidates = (_last_config_path,) + tuple(p for p in _CONFIG_PATHS if p != _last_config_path)
+        for path in candidates:
+            if os.path.isfile(path):
+                _last_config_path = path
                 return ("✓", f"配置正常 ({os.path.basename(path)})")
+        _last_config_path = None
         return ("!", "未找到配置文件")
     except Exception as e:
         return ("!", f"检查失败: {e}")
@@ -262,11 +328,12 @@ def _check_config() -> tuple:
 def _check_disk_space() -> tuple:
     """检查磁盘空间."""
     try:
-        import shutil
-        stat = shutil.disk_usage("/")
-        free_gb = stat.free / (1024**3)
-        total_gb = stat.total / (1024**3)
-        percent_free = (stat.free / stat.total) * 100
+        st = os.statvfs("/")
+        free = st.f_bavail * st.f_frsize
+        total = st.f_blocks * st.f_frsize
+        free_gb = free / (1 << 30)
+        total_gb = total / (1 << 30)
+        percent_free = (free / total) * 100
         
         if percent_free < 10:
             return ("!", f"空间不足: {free_gb:.1f}GB / {total_gb:.1f}GB")
@@ -278,17 +345,13 @@ def _check_disk_space() -> tuple:
 def _check_memory() -> tuple:
     """检查内存使用."""
     try:
-        with open('/proc/meminfo', 'r') as f:
-            meminfo = f.read()
-        
-        mem_total = 0
-        mem_available = 0
+        # MemTotal / MemAvailable 均位于文件开头，读取前 4KiB 即可
+        with open('/proc/meminfo', 'rb') as f:
+            meminfo = f.read(4096)
         
-        for line in meminfo.split('\n'):
-            if line.startswith('MemTotal:'):
-                mem_total = int(line.split()[1]) / 1024 / 1024  # GB
-            elif line.startswith('MemAvailable:'):
-                mem_available = int(line.split()[1]) / 1024 / 1024  # GB
+        fields = dict(_MEMINFO_RE.findall(meminfo))
+        mem_total = int(fields.get(b'Total', 0)) / 1024 / 1024  # GB
+        mem_available = int(fields.get(b'Available', 0)) / 1024 / 1024  # GB
         
         if mem_total > 0:
             percent_available = (mem_available / mem_total) * 100
@@ -3,11 +3,13 @@
 完全对齐 OpenClaw 官方 CLI 实现
 优化版：模型按服务商分组、小贴士、错误提示友好化
 """
-import json
+import functools
 import os
 import re
+import threading
 import time
-from typing import List, Optional
+from itertools import groupby
+from typing import Dict, List, Optional, Sequence, Union
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
@@ -16,7 +18,7 @@ from rich.prompt import Prompt, Confirm
 from rich import box
 
 from core import (
-    OPENCLAW_BIN,
+    agent_meta_generation,
     config,
     get_agent_control_plane_capabilities,
     get_agent_permission_overrides,
@@ -42,9 +44,78 @@ from core.runtime_env import (
     recommended_capability_preset_for_runtime,
 )
 
-console = Console()
+from core.utils import (
+    MenuFrame,
+    buffered_stdout,
+    pause_enter,
+    render_screen,
+    safe_input,
+    static_text,
+    title_panel,
+)
+
+console = Console(file=buffered_stdout())
+
 
-from core.utils import safe_input, pause_enter
+# 静态标题/提示面板在模块加载时构建一次，各菜单重绘时直接复用
+_TIP_ROUTING = Panel(
+    Text("💡 在这里设置你的默认模型和备选链，OpenClaw 会自动切换", style="dim", justify="center"),
+    box=box.ROUNDED,
+    border_style="blue",
+)
+_HEADER_CONFIG = Panel(Text("当前配置", style="bold", justify="center"), box=box.DOUBLE)
+_HEADER_SPAWN_POLICY = title_panel("🧬 Spawn Agent 默认模型优先级")
+_HEADER_GLOBAL_POLICY = title_panel("🌐 全局模型优先级")
+_HEADER_WORKSPACES = title_panel("🗂️ 工作区管理")
+_HEADER_MAIN_AGENTS = title_panel("🧭 Agent 与工作区")
+_HEADER_AGENT_POLICY = title_panel("🎯 Agent 模型优先级")
+_HEADER_SET_DEFAULT = title_panel("🌟 设置首选模型")
+_HEADER_FALLBACKS = title_panel("🔄 管理备选链")
+_HEADER_ADD_FALLBACK = title_panel("➕ 添加备选模型")
+_HEADER_REMOVE_FALLBACK = title_panel("➖ 移除备选模型")
+_HEADER_SUBAGENTS = title_panel("👥 Agent 派发管理")
+
+
+# 固定文案行：导入时解析一次，重绘时不再走 markup 解析
+_ROUTING_HEADER = static_text("[bold cyan]========== 🤖 任务指派 (Routing) ==========[/]")
+_ROUTING_ACTIONS = static_text(
+    "[bold]操作:[/]",
+    "  [cyan]1[/] 设置首选模型",
+    "  [cyan]2[/] 管理备选链",
+    "  [cyan]3[/] Agent派发管理",
+    "  [cyan]4[/] 主 Agent 管理",
+    "  [cyan]0[/] 返回",
+)
+_SPAWN_POLICY_ACTIONS = static_text(
+    "[bold]操作:[/]",
+    "  [cyan]1[/] 设置/更新 Spawn 默认模型",
+    "  [cyan]2[/] 清除 Spawn 覆盖（继承全局）",
+    "  [cyan]0[/] 返回",
+)
+_GLOBAL_POLICY_ACTIONS = static_text(
+    "[bold]操作:[/]",
+    "  [cyan]1[/] 设置全局主模型",
+    "  [cyan]2[/] 设置全局备用链",
+    "  [cyan]0[/] 返回",
+)
+_TIPS_SET_DEFAULT = static_text("  [dim]💡 首选模型是 OpenClaw 优先使用的模型[/]")
+_TIPS_FALLBACKS = static_text(
+    "  [dim]💡 备选链是当首选模型不可用时，OpenClaw 会依次尝试的模型[/]",
+    "  [dim]   支持多层备选：首选 → 备选1 → 备选2 → ...[/]",
+    "  [dim]⚠️  目前 OpenClaw 官方 CLI 仅支持追加到末尾，暂不支持插入或重新排序[/]",
+)
+_FALLBACK_ACTIONS = static_text(
+    "[bold]操作:[/]",
+    "  [cyan]1[/] 添加备选模型",
+    "  [cyan]2[/] 移除备选模型",
+    "  [cyan]3[/] 清空备选链",
+    "  [cyan]0[/] 返回",
+)
+_TIPS_SUBAGENTS = static_text(
+    "  [dim]💡 可选择任意固定 Agent，配置其派发开关与并发策略[/]",
+    "  [dim]💡 被选中的固定 Agent 可继续向下派发（多层链路）[/]",
+    "  [dim]💡 白名单按 Agent ID 生效：更适合固定 Agent；临时 spawn 需可匹配 ID 才能精确限制[/]",
+)
 
 
 def _run_menu_action(action, label: str):
@@ -63,17 +134,21 @@ def _run_menu_action(action, label: str):
 
 WORKSPACE_SUFFIX_RE = re.compile(r"^workspace(?:_(\d+))?$")
 AGENT_ID_RE = re.compile(r"^[A-Za-z][A-Za-z0-9_-]*$")
+MAIN_AGENT_ID_RE = re.compile(r"^main(\d*)$")
 OPENCLAW_VALID_AGENT_ID_RE = re.compile(r"^[a-z0-9][a-z0-9_-]{0,63}$", re.IGNORECASE)
 OPENCLAW_INVALID_AGENT_ID_CHARS_RE = re.compile(r"[^a-z0-9_-]+")
 OPENCLAW_LEADING_DASH_RE = re.compile(r"^-+")
 OPENCLAW_TRAILING_DASH_RE = re.compile(r"-+$")
-REQUIRED_WORKSPACE_FILES = ["AGENTS.md", "SOUL.md"]
-DEFAULT_CONTROL_PLANE_CAPABILITIES = [
+REQUIRED_WORKSPACE_FILES = ("AGENTS.md", "SOUL.md")
+WS_HEALTH_TTL = 2.0
+WORKSPACE_SCAFFOLD_DIRS = ("project", "scripts", "skills", "worktrees", "software")
+# 能力清单为只读常量（tuple），可直接传给写入函数，无需防御性复制
+DEFAULT_CONTROL_PLANE_CAPABILITIES = (
     "model.switch",        # /model
     "status.usage.read",   # /status 用量查询
     "skill.usage.read",    # /skill 用量查询
-]
-RECOMMENDED_CONTROL_PLANE_CAPABILITIES = [
+)
+RECOMMENDED_CONTROL_PLANE_CAPABILITIES = (
     "model.switch",      # /model
     "status.read",       # /status
     "skill.read",        # /skill
@@ -81,8 +156,23 @@ RECOMMENDED_CONTROL_PLANE_CAPABILITIES = [
     "generation.stop",   # /stop
     "usage.read",        # /usage
     "session.reset",     # /reset
-]
-_MODEL_STATUS_CACHE = {"ts": 0.0, "default": None, "fallbacks": []}
+)
+MODEL_STATUS_TTL = 5.0
+# 模型状态缓存：(代数, 写入时间, 配置文件版本, default, fallbacks)，整体替换以保证一致
+_MODEL_STATUS_CACHE: tuple = (0, 0.0, None, None, [])
+_MODEL_STATUS_LOCK = threading.Lock()
+# 任务指派首页的子 Agent 状态：按 config.generation 缓存，子菜单返回后配置未变则直接复用
+_ROUTING_STATE_CACHE = {"generation": None, "sub_status": None}
+# 备选链管理会话：记录本次会话已做的配置备份，连续修改只备份一次
+_FALLBACK_SESSION = {"backup": None}
+# Agent 行预处理缓存；dispatch 为派发管理视图 (rows, agents)，随行缓存重建而清空、按需计算
+_AGENT_ROWS_CACHE = {"key": None, "rows": [], "by_id": {}, "dispatch": None}
+# 工作区健康状态短时缓存：{workspace: (monotonic_ts, health)}
+_WS_HEALTH_CACHE: Dict[str, tuple] = {}
+# _extract_agent_settings 结果：{"generation": (config 版本, 元数据版本), "items": {id(agent): (agent, settings)}}
+_AGENT_SETTINGS_CACHE = {"generation": None, "items": {}}
+# 工作区根目录候选：只随 agents.defaults.workspace 与配置路径变化，按 (config 版本, 路径) 缓存
+_WORKSPACE_ROOTS_CACHE = {"key": None, "roots": []}
 
 
 def _get_agents_list() -> List[dict]:
@@ -90,18 +180,69 @@ def _get_agents_list() -> List[dict]:
     return agents if isinstance(agents, list) else []
 
 
+def _normalized_agents() -> List[tuple]:
+    """Agent 行预处理：[(agent, id, is_main, workspace), ...]
+
+    每行只做一次 str()/get 转换；按 (config.generation, 列表对象, 长度) 缓存，
+    配置重新加载或列表增删后自动重建。
+    """
+    agents = _get_agents_list()
+    key = (config.generation, id(agents), len(agents))
+    if _AGENT_ROWS_CACHE["key"] != key:
+        rows = []
+        by_id = {}
+        for pos, a in enumerate(agents):
+            if not isinstance(a, dict):
+                continue
+            aid = str(a.get("id", ""))
+            rows.append((a, aid, aid.startswith("main"), _agent_workspace(a)))
+            if aid:
+                by_id.setdefault(aid, (pos, a))
+        _AGENT_ROWS_CACHE.update(key=key, rows=rows, by_id=by_id, dispatch=None)
+    return _AGENT_ROWS_CACHE["rows"]
+
+
+def _agents_by_id_index() -> Dict[str, tuple]:
+    """{agent_id: (在 agents.list 中的位置, agent)}，与 _normalized_agents 同步缓存"""
+    _normalized_agents()
+    return _AGENT_ROWS_CACHE["by_id"]
+
+
+def _agent_workspace(agent: dict) -> str:
+    """Agent 绑定的 workspace（去首尾空白），未绑定返回空串"""
+    ws = agent.get("workspace")
+    if isinstance(ws, str):
+        return ws.strip()
+    return str(ws or "").strip()
+
+
 def _main_agents() -> List[dict]:
-    return [a for a in _get_agents_list() if isinstance(a, dict) and str(a.get("id", "")).startswith("main")]
+    return [a for a, _, is_main, _ in _normalized_agents() if is_main]
+
+
+def _dispatch_view() -> tuple:
+    """派发管理视图 (rows, agents)，与 Agent 行缓存同步失效（返回值勿修改）"""
+    rows_all = _normalized_agents()
+    view = _AGENT_ROWS_CACHE["dispatch"]
+    if view is None:
+        mains, others = [], []
+        for row in rows_all:
+            if row[1].strip():
+                (mains if row[2] else others).append(row)
+        rows = mains + others
+        view = (rows, [r[0] for r in rows])
+        _AGENT_ROWS_CACHE["dispatch"] = view
+    return view
+
+
+def _dispatch_manageable_rows() -> List[tuple]:
+    """可在派发管理中配置的固定 Agent 行（优先 main），格式同 _normalized_agents"""
+    return _dispatch_view()[0]
 
 
 def _dispatch_manageable_agents() -> List[dict]:
     """可在派发管理中配置的固定 Agent 列表（优先 main）"""
-    agents = [a for a in _get_agents_list() if isinstance(a, dict) and str(a.get("id", "")).strip()]
-    if not agents:
-        return []
-    mains = [a for a in agents if str(a.get("id", "")).startswith("main")]
-    others = [a for a in agents if not str(a.get("id", "")).startswith("main")]
-    return mains + others
+    return _dispatch_view()[1]
 
 
 def _is_valid_agent_id(agent_id: str) -> bool:
@@ -189,20 +330,28 @@ def _resolve_created_agent_entry(agent_id: str, workspace_path: str, existing_id
 
 
 def _next_main_agent_id() -> str:
-    ids = {str(a.get("id", "")) for a in _main_agents()}
-    if "main" not in ids:
+    # 单次遍历记录最大编号，直接取 max+1（不回填中间空号）
+    has_plain = False
+    max_idx = 0
+    for _, aid, is_main, _ in _normalized_agents():
+        if not is_main:
+            continue
+        m = MAIN_AGENT_ID_RE.match(aid)
+        if not m:
+            continue
+        if m.group(1):
+            max_idx = max(max_idx, int(m.group(1)))
+        else:
+            has_plain = True
+    if not has_plain:
         return "main"
-    idx = 1
-    while f"main{idx}" in ids:
-        idx += 1
-    return f"main{idx}"
+    return f"main{max_idx + 1}"
 
 
 def _recommended_main_agent_id() -> str:
     # 优先修复已有但未绑定 workspace 的 main agent
     for a in _main_agents():
-        ws = str(a.get("workspace", "") or "").strip()
-        if not ws:
+        if not _agent_workspace(a):
             return str(a.get("id", "main") or "main")
     return _next_main_agent_id()
 
@@ -217,9 +366,11 @@ def _default_agent_id_for_form(agents: List[dict]) -> str:
 
 
 def _agent_by_id(agent_id: str) -> dict:
-    return next((a for a in _get_agents_list() if isinstance(a, dict) and str(a.get("id", "")) == agent_id), {})
+    hit = _agents_by_id_index().get(agent_id)
+    return hit[1] if hit else {}
 
 
+@functools.lru_cache(maxsize=256)
 def _short_workspace(path: str) -> str:
     p = str(path or "").strip()
     if not p:
@@ -229,38 +380,60 @@ def _short_workspace(path: str) -> str:
     return "..." + p[-31:]
 
 
+def _workspace_entry_names(path: str) -> Optional[set]:
+    """一次 scandir 同时完成“目录是否存在”与目录项列举；目录不存在返回 None"""
+    try:
+        with os.scandir(path) as it:
+            return {entry.name for entry in it}
+    except OSError:
+        return None
+
+
 def _workspace_health(agent: dict) -> str:
-    ws = str(agent.get("workspace", "") or "").strip()
+    ws = _agent_workspace(agent)
     if not ws:
         return "[yellow]未绑定[/]"
-    if not os.path.isdir(ws):
-        return "[red]目录不存在[/]"
-    missing = [name for name in REQUIRED_WORKSPACE_FILES if not os.path.exists(os.path.join(ws, name))]
-    if missing:
-        return "[yellow]缺关键文件[/]"
-    return "[green]正常[/]"
+    now = time.monotonic()
+    cached = _WS_HEALTH_CACHE.get(ws)
+    if cached and now - cached[0] < WS_HEALTH_TTL:
+        return cached[1]
+    names = _workspace_entry_names(ws)
+    if names is None:
+        health = "[red]目录不存在[/]"
+    else:
+        if any(name not in names for name in REQUIRED_WORKSPACE_FILES):
+            health = "[yellow]缺关键文件[/]"
+        else:
+            health = "[green]正常[/]"
+    _WS_HEALTH_CACHE[ws] = (now, health)
+    return health
 
 
-def _resolve_agent_id_input(ids: List[str], raw: str) -> str:
+def _agent_id_lookup(ids: List[str]) -> tuple:
+    """预构建 (ID 集合, 小写 -> ID 映射)，供多次解析输入复用"""
+    return frozenset(ids), {x.lower(): x for x in ids}
+
+
+def _resolve_agent_id_input(ids: List[str], raw: str, lookup: Optional[tuple] = None) -> str:
+    ids_set, lower_map = lookup or _agent_id_lookup(ids)
     val = (raw or "").strip()
-    if val in ids:
+    if val in ids_set:
         return val
-    lower_map = {x.lower(): x for x in ids}
     return lower_map.get(val.lower(), "")
 
 
 def _invalidate_model_status_cache():
-    _MODEL_STATUS_CACHE["ts"] = 0.0
-    _MODEL_STATUS_CACHE["default"] = None
-    _MODEL_STATUS_CACHE["fallbacks"] = []
+    global _MODEL_STATUS_CACHE
+    _MODEL_STATUS_CACHE = (_MODEL_STATUS_CACHE[0] + 1, 0.0, None, None, [])
 
 
 def _select_agent_id(ids: List[str], title: str = "请选择 Agent", default_id: str = "") -> str:
     """优先编号选择，支持 m 手动输入 ID 兜底"""
     if not ids:
         return ""
+    lookup = _agent_id_lookup(ids)
     idx_default = ids[0]
-    if default_id and default_id in ids:
+    if default_id and default_id in lookup[0]:
         idx_default = default_id
 
     console.print()
@@ -278,7 +451,7 @@ def _select_agent_id(ids: List[str], title: str = "请选择 Agent", default_id:
         return ""
     if pick == "m":
         raw = Prompt.ask("[bold]请输入 Agent ID[/]", default=idx_default).strip()
-        return _resolve_agent_id_input(ids, raw)
+        return _resolve_agent_id_input(ids, raw, lookup)
     idx = int(pick) - 1
     if 0 <= idx < len(ids):
         return ids[idx]
@@ -477,6 +650,15 @@ def _workspace_runtime_root() -> str:
 
 
 def _workspace_root_candidates() -> List[str]:
+    """工作区根目录候选（返回缓存列表，勿修改）"""
+    key = (config.generation, config.path)
+    if _WORKSPACE_ROOTS_CACHE["key"] != key:
+        _WORKSPACE_ROOTS_CACHE["roots"] = _compute_workspace_root_candidates()
+        _WORKSPACE_ROOTS_CACHE["key"] = key
+    return _WORKSPACE_ROOTS_CACHE["roots"]
+
+
+def _compute_workspace_root_candidates() -> List[str]:
     defaults = config.data.get("agents", {}).get("defaults", {}) or {}
     runtime_root = _workspace_runtime_root()
     out: List[str] = []
@@ -523,7 +705,7 @@ def _next_workspace_path(existing_agents: List[dict]) -> str:
     parent_normalized = _normalize_abs_path(parent)
     used = set()
     for a in existing_agents:
-        ws = _normalize_abs_path(str(a.get("workspace", "") or ""))
+        ws = _normalize_abs_path(_agent_workspace(a))
         if not ws:
             continue
         if os.path.dirname(ws) != parent_normalized:
@@ -534,15 +716,16 @@ def _next_workspace_path(existing_agents: List[dict]) -> str:
             raw = m.group(1)
             used.add(0 if raw is None else int(raw))
 
-    if 0 not in used and not os.path.exists(os.path.join(parent, "workspace")):
+    # 一次列举父目录，候选名在内存中比对，避免逐个 exists
+    existing = _workspace_entry_names(parent) or set()
+    if 0 not in used and "workspace" not in existing:
         return os.path.join(parent, "workspace")
 
     idx = 1
     while True:
-        if idx not in used:
-            candidate = os.path.join(parent, f"workspace_{idx:02d}")
-            if not os.path.exists(candidate):
-                return candidate
+        name = f"workspace_{idx:02d}"
+        if idx not in used and name not in existing:
+            return os.path.join(parent, name)
         idx += 1
 
 
@@ -564,44 +747,55 @@ def _validate_existing_workspace(path: str):
     p = _normalize_abs_path(path)
     if not _validate_workspace_path(p):
         return False, f"workspace 必须在 {_workspace_root_hint()} 下，且名称需以 workspace 开头"
-    if not os.path.isdir(p):
+    names = _workspace_entry_names(p)
+    if names is None:
         return False, "workspace 目录不存在（仅允许绑定已有目录）"
-    missing = [name for name in REQUIRED_WORKSPACE_FILES if not os.path.exists(os.path.join(p, name))]
+    missing = [name for name in REQUIRED_WORKSPACE_FILES if name not in names]
     if missing:
         return False, f"workspace 缺少必要文件: {', '.join(missing)}"
     return True, ""
 
 
 def _detect_existing_workspace(existing_agents: List[dict]) -> str:
-    used = {
-        _normalize_abs_path(str(a.get("workspace", "") or ""))
-        for a in existing_agents
-        if isinstance(a, dict) and _normalize_abs_path(str(a.get("workspace", "") or ""))
-    }
+    used = {_normalize_abs_path(_agent_workspace(a)) for a in existing_agents if isinstance(a, dict)}
+    used.discard("")
 
     for parent in _workspace_root_candidates():
-        if not parent or not os.path.isdir(parent):
+        if not parent:
+            continue
+        # 单次 scandir：目录项类型来自 dirent，无需逐项 isdir
+        try:
+            with os.scandir(parent) as it:
+                names = [entry.name for entry in it if entry.name.startswith("workspace") and entry.is_dir()]
+        except OSError:
             continue
 
-        preferred = _normalize_abs_path(os.path.join(parent, "workspace"))
-        if os.path.isdir(preferred) and preferred not in used:
-            return preferred
-
-        candidates = []
-        for name in sorted(os.listdir(parent)):
-            path = os.path.join(parent, name)
-            if os.path.isdir(path) and name.startswith("workspace"):
-                candidates.append(_normalize_abs_path(path))
-
-        for candidate in candidates:
+        # "workspace" 是所有候选名的前缀，排序后天然排在首位（即优先目录）
+        names.sort()
+        for name in names:
+            candidate = _normalize_abs_path(os.path.join(parent, name))
             if candidate not in used:
                 return candidate
     return ""
 
 
-def _build_model_config(primary: str, fallbacks_csv: str):
+def _ensure_path(d: dict, keys) -> dict:
+    """沿 keys 逐级取子字典，缺失或非字典（如 None）时就地替换为空字典"""
+    for k in keys:
+        sub = d.get(k)
+        if not isinstance(sub, dict):
+            sub = {}
+            d[k] = sub
+        d = sub
+    return d
+
+
+def _build_model_config(primary: str, fallbacks: Union[str, List[str]]):
+    """fallbacks 可为列表（内部传递）或逗号分隔字符串（用户输入/旧调用方）"""
     primary = (primary or "").strip()
-    fallbacks = [x.strip() for x in (fallbacks_csv or "").split(",") if x.strip()]
+    if isinstance(fallbacks, str):
+        fallbacks = fallbacks.split(",")
+    fallbacks = [str(x).strip() for x in (fallbacks or []) if str(x).strip()]
     if not primary and not fallbacks:
         return None
     # OpenClaw 新版本要求 model 使用对象结构。
@@ -609,6 +803,7 @@ def _build_model_config(primary: str, fallbacks_csv: str):
 
 
 def _ensure_workspace_scaffold(workspace_path: str, agent_id: str):
+    _WS_HEALTH_CACHE.pop(str(workspace_path or "").strip(), None)
     os.makedirs(workspace_path, exist_ok=True)
     # 默认完整模板：核心元信息文件 + 常用目录
     templates = {
@@ -623,13 +818,19 @@ def _ensure_workspace_scaffold(workspace_path: str, agent_id: str):
         "memory.md": "# memory\n\n- Scratch/short notes.\n",
     }
     for file_name, content in templates.items():
-        target = os.path.join(workspace_path, file_name)
-        if not os.path.exists(target):
-            with open(target, "w", encoding="utf-8") as f:
-                f.write(content)
+        # O_EXCL：已存在则原子失败，省去 exists 检查且不会覆盖用户文件
+        try:
+            fd = os.open(os.path.join(workspace_path, file_name), os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            continue
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
 
-    for folder in ["project", "scripts", "skills", "worktrees", "software"]:
-        os.makedirs(os.path.join(workspace_path, folder), exist_ok=True)
+    with os.scandir(workspace_path) as it:
+        existing = {entry.name for entry in it}
+    for folder in WORKSPACE_SCAFFOLD_DIRS:
+        if folder not in existing:
+            os.makedirs(os.path.join(workspace_path, folder), exist_ok=True)
 
 
 def _ensure_agent_runtime_dirs(agent_id: str):
@@ -643,10 +844,10 @@ def upsert_main_agent_config(
     agent_id: str,
     workspace_path: str,
     model_primary: str = "",
-    model_fallbacks_csv: str = "",
+    model_fallbacks: Union[str, List[str]] = "",
     allow_agents: Optional[List[str]] = None,
     sub_model_primary: str = "",
-    sub_model_fallbacks_csv: str = "",
+    sub_model_fallbacks: Union[str, List[str]] = "",
     access_mode: str = "rw",
     capability_preset: str = "workspace-collab",
     control_plane_capabilities: Optional[List[str]] = None,
@@ -660,14 +861,14 @@ def upsert_main_agent_config(
 
     agent_entry = {"id": agent_id, "workspace": workspace_path.rstrip("/")}
 
-    model_cfg = _build_model_config(model_primary, model_fallbacks_csv)
+    model_cfg = _build_model_config(model_primary, model_fallbacks)
     if model_cfg:
         agent_entry["model"] = model_cfg
 
     sub_cfg = {}
     if allow_agents is not None:
         sub_cfg["allowAgents"] = allow_agents
-    sub_model_cfg = _build_model_config(sub_model_primary, sub_model_fallbacks_csv)
+    sub_model_cfg = _build_model_config(sub_model_primary, sub_model_fallbacks)
     if sub_model_cfg:
         sub_cfg["model"] = sub_model_cfg
     if sub_cfg:
@@ -689,44 +890,59 @@ def upsert_main_agent_config(
         permission_overrides=effective_permission_overrides,
     )
 
-    agents_root = config.data.setdefault("agents", {})
+    agents_root = _ensure_path(config.data, ("agents",))
     agents_list = agents_root.get("list")
     if not isinstance(agents_list, list):
         agents_list = []
         agents_root["list"] = agents_list
 
     replaced = False
-    for i, row in enumerate(agents_list):
-        if isinstance(row, dict) and row.get("id") == agent_id:
-            # 保留未知字段，避免菜单更新时误删未来扩展配置
-            merged = dict(row)
-            merged["id"] = agent_entry["id"]
-            merged["workspace"] = agent_entry["workspace"]
-
-            if "model" in agent_entry:
-                merged["model"] = agent_entry["model"]
-            else:
-                merged.pop("model", None)
+    hit = _agents_by_id_index().get(agent_id)
+    # 索引只按 (generation, 列表对象, 长度) 失效：id 被原地改写或列表未保存就重排时位置会过期，
+    # 写回前核对该位置仍是同一条目，否则（含未命中）回退线性查找
+    if not (
+        hit
+        and hit[0] < len(agents_list)
+        and agents_list[hit[0]] is hit[1]
+        and str(hit[1].get("id", "")) == agent_id
+    ):
+        hit = next(
+            ((i, row) for i, row in enumerate(agents_list) if isinstance(row, dict) and row.get("id") == agent_id),
+            None,
+        )
+    if hit:
+        i, row = hit
+        # 保留未知字段，避免菜单更新时误删未来扩展配置
+        merged = dict(row)
+        merged["id"] = agent_entry["id"]
+        merged["workspace"] = agent_entry["workspace"]
+
+        if "model" in agent_entry:
+            merged["model"] = agent_entry["model"]
+        else:
+            merged.pop("model", None)
 
-            if "subagents" in agent_entry:
-                existing_sub = merged.get("subagents") if isinstance(merged.get("subagents"), dict) else {}
-                new_sub = dict(existing_sub)
-                new_sub.update(agent_entry["subagents"])
-                merged["subagents"] = new_sub
-            else:
-                merged.pop("subagents", None)
+        if "subagents" in agent_entry:
+            existing_sub = merged.get("subagents") if isinstance(merged.get("subagents"), dict) else {}
+            new_sub = dict(existing_sub)
+            new_sub.update(agent_entry["subagents"])
+            merged["subagents"] = new_sub
+        else:
+            merged.pop("subagents", None)
 
-            merged.pop("security", None)
-            merged["sandbox"] = agent_entry["sandbox"]
-            merged["tools"] = agent_entry["tools"]
+        merged.pop("security", None)
+        merged["sandbox"] = agent_entry["sandbox"]
+        merged["tools"] = agent_entry["tools"]
 
-            agents_list[i] = merged
-            replaced = True
-            break
+        agents_list[i] = merged
+        replaced = True
     if not replaced and require_existing:
         return False
     if not replaced:
         agents_list.append(agent_entry)
+    # 列表条目被原地替换，预处理行缓存需重建
+    _AGENT_ROWS_CACHE["key"] = None
+    _WS_HEALTH_CACHE.pop(agent_entry["workspace"], None)
 
     _ensure_workspace_scaffold(workspace_path, agent_id)
     _ensure_agent_runtime_dirs(agent_id)
@@ -738,27 +954,42 @@ def upsert_main_agent_config(
 
 
 def _extract_agent_settings(target: dict) -> dict:
+    """解析 Agent 配置项；同一配置/元数据版本内按 dict 对象缓存（返回值勿修改）"""
+    generation = (config.generation, agent_meta_generation())
+    if _AGENT_SETTINGS_CACHE["generation"] != generation:
+        _AGENT_SETTINGS_CACHE["generation"] = generation
+        _AGENT_SETTINGS_CACHE["items"] = {}
+    cached = _AGENT_SETTINGS_CACHE["items"].get(id(target))
+    # 同时保存 target 引用：既防止 id 复用误命中，也确保命中的是同一对象
+    if cached is not None and cached[0] is target:
+        return cached[1]
+    settings = _compute_agent_settings(target)
+    _AGENT_SETTINGS_CACHE["items"][id(target)] = (target, settings)
+    return settings
+
+
+def _compute_agent_settings(target: dict) -> dict:
     model_primary = ""
-    model_fallbacks = ""
+    model_fallbacks: List[str] = []
     existing_model = target.get("model")
     if isinstance(existing_model, str):
         model_primary = existing_model
     elif isinstance(existing_model, dict):
         model_primary = str(existing_model.get("primary", "") or "")
-        model_fallbacks = ",".join(existing_model.get("fallbacks", []) or [])
+        model_fallbacks = list(existing_model.get("fallbacks", []) or [])
 
     sub_cfg = target.get("subagents") if isinstance(target.get("subagents"), dict) else {}
     allow_agents = sub_cfg.get("allowAgents")
     if allow_agents is None:
         allow_agents = []
     sub_model_primary = ""
-    sub_model_fallbacks = ""
+    sub_model_fallbacks: List[str] = []
     existing_sub_model = sub_cfg.get("model")
     if isinstance(existing_sub_model, str):
         sub_model_primary = existing_sub_model
     elif isinstance(existing_sub_model, dict):
         sub_model_primary = str(existing_sub_model.get("primary", "") or "")
-        sub_model_fallbacks = ",".join(existing_sub_model.get("fallbacks", []) or [])
+        sub_model_fallbacks = list(existing_sub_model.get("fallbacks", []) or [])
 
     access = extract_agent_access_profile(target)
     permission_overrides = get_agent_permission_overrides(str(target.get("id", "") or ""))
@@ -785,7 +1016,7 @@ def _extract_agent_settings(target: dict) -> dict:
     }
 
 
-def set_agent_control_plane_whitelist(agent_id: str, enabled: bool, capabilities: Optional[List[str]] = None) -> bool:
+def set_agent_control_plane_whitelist(agent_id: str, enabled: bool, capabilities: Optional[Sequence[str]] = None) -> bool:
     target = _agent_by_id(agent_id)
     if not target:
         return False
@@ -793,17 +1024,17 @@ def set_agent_control_plane_whitelist(agent_id: str, enabled: bool, capabilities
     if not settings["workspace_path"]:
         return False
 
-    caps = capabilities if enabled else []
-    caps = [str(x).strip() for x in (caps or []) if str(x).strip()]
+    caps = capabilities if enabled else ()
+    caps = [x for x in (str(item).strip() for item in (caps or ())) if x]
 
     return upsert_main_agent_config(
         agent_id=agent_id,
         workspace_path=settings["workspace_path"],
         model_primary=settings["model_primary"],
-        model_fallbacks_csv=settings["model_fallbacks"],
+        model_fallbacks=settings["model_fallbacks"],
         allow_agents=settings["allow_agents"],
         sub_model_primary=settings["sub_model_primary"],
-        sub_model_fallbacks_csv=settings["sub_model_fallbacks"],
+        sub_model_fallbacks=settings["sub_model_fallbacks"],
         access_mode=settings["access_mode"],
         capability_preset=settings["capability_preset"],
         control_plane_capabilities=caps,
@@ -822,10 +1053,10 @@ def set_agent_permission_policy(agent_id: str, permission_overrides: Optional[di
         agent_id=agent_id,
         workspace_path=settings["workspace_path"],
         model_primary=settings["model_primary"],
-        model_fallbacks_csv=settings["model_fallbacks"],
+        model_fallbacks=settings["model_fallbacks"],
         allow_agents=settings["allow_agents"],
         sub_model_primary=settings["sub_model_primary"],
-        sub_model_fallbacks_csv=settings["sub_model_fallbacks"],
+        sub_model_fallbacks=settings["sub_model_fallbacks"],
         access_mode=settings["access_mode"],
         capability_preset=settings["capability_preset"],
         control_plane_capabilities=settings["control_caps"],
@@ -845,20 +1076,20 @@ def create_agent_with_official_cli(
     stdout, stderr, code = run_cli(["agents", "add", agent_id, "--workspace", workspace_path])
     if code != 0:
         return False, stderr or stdout or "openclaw agents add failed", ""
-    config.reload()
+    config.reload_if_changed()
     created_entry = _resolve_created_agent_entry(agent_id, workspace_path, before_ids)
     resolved_agent_id = str(created_entry.get("id", "") or "").strip()
     if not resolved_agent_id:
         return False, "官方 CLI 未写入 Agent，无法继续应用 EasyClaw 附加设置", ""
-    resolved_workspace = str(created_entry.get("workspace", "") or "").strip() or workspace_path
+    resolved_workspace = _agent_workspace(created_entry) or workspace_path
     ok = upsert_main_agent_config(
         agent_id=resolved_agent_id,
         workspace_path=resolved_workspace,
         model_primary="",
-        model_fallbacks_csv="",
+        model_fallbacks="",
         allow_agents=[],
         sub_model_primary="",
-        sub_model_fallbacks_csv="",
+        sub_model_fallbacks="",
         access_mode=access_mode,
         capability_preset=capability_preset,
         control_plane_capabilities=control_plane_capabilities or [],
@@ -884,10 +1115,10 @@ def set_agent_model_policy(agent_id: str, primary: str, fallbacks_csv: str) -> b
         agent_id=agent_id,
         workspace_path=settings["workspace_path"],
         model_primary=primary,
-        model_fallbacks_csv=fallbacks_csv,
+        model_fallbacks=fallbacks_csv,
         allow_agents=settings["allow_agents"],
         sub_model_primary=settings["sub_model_primary"],
-        sub_model_fallbacks_csv=settings["sub_model_fallbacks"],
+        sub_model_fallbacks=settings["sub_model_fallbacks"],
         access_mode=settings["access_mode"],
         capability_preset=settings["capability_preset"],
         control_plane_capabilities=settings["control_caps"],
@@ -900,7 +1131,7 @@ def clear_agent_model_policy(agent_id: str) -> bool:
 
 def list_agent_model_overrides() -> List[str]:
     """返回已配置独立模型策略的 Agent ID 列表。"""
-    config.reload()
+    config.reload_if_changed()
     out = []
     for a in _dispatch_manageable_agents():
         settings = _extract_agent_settings(a)
@@ -913,7 +1144,12 @@ def list_agent_model_overrides() -> List[str]:
 
 def list_agent_model_override_details() -> List[dict]:
     """返回已配置独立模型的 Agent 详情（主模型/备选链）。"""
-    config.reload()
+    config.reload_if_changed()
+    return _agent_model_override_details_from_config()
+
+
+def _agent_model_override_details_from_config() -> List[dict]:
+    """基于当前内存中的 config.data 计算 Agent 独立模型详情（不重新加载）。"""
     out = []
     for a in _dispatch_manageable_agents():
         settings = _extract_agent_settings(a)
@@ -922,7 +1158,7 @@ def list_agent_model_override_details() -> List[dict]:
         aid = str(a.get("id", "")).strip()
         if not aid:
             continue
-        fallbacks = [x.strip() for x in str(settings["model_fallbacks"] or "").split(",") if x.strip()]
+        fallbacks = [x.strip() for x in settings["model_fallbacks"] if x.strip()]
         out.append({
             "agent_id": aid,
             "primary": str(settings["model_primary"] or "").strip(),
@@ -933,22 +1169,35 @@ def list_agent_model_override_details() -> List[dict]:
 
 def get_spawn_model_policy() -> tuple:
     """获取 Spawn Agent 默认模型策略（agents.defaults.subagents.model）。"""
-    config.reload()
+    config.reload_if_changed()
+    return _spawn_model_policy_from_config()
+
+
+def _spawn_model_policy_from_config() -> tuple:
     sub = config.data.get("agents", {}).get("defaults", {}).get("subagents", {}) or {}
     model_cfg = sub.get("model")
     primary, fallbacks = _extract_model_cfg(model_cfg)
     return primary, fallbacks
 
 
+def get_model_provider_snapshot() -> tuple:
+    """单次加载配置，返回 (主模型, 备用链, Agent 独立模型详情, Spawn 主模型, Spawn 备用链)。"""
+    config.reload_if_changed()
+    default_model, fallbacks = _get_model_status(reload=False)
+    spawn_primary, spawn_fallbacks = _spawn_model_policy_from_config()
+    return (
+        default_model,
+        fallbacks,
+        _agent_model_override_details_from_config(),
+        spawn_primary,
+        spawn_fallbacks,
+    )
+
+
 def set_spawn_model_policy(primary: str, fallbacks_csv: str) -> bool:
     """设置 Spawn Agent 默认模型策略（为空则清除，回到继承全局）。"""
-    config.reload()
-    agents = config.data.setdefault("agents", {})
-    defaults = agents.setdefault("defaults", {})
-    sub = defaults.get("subagents")
-    if not isinstance(sub, dict):
-        sub = {}
-        defaults["subagents"] = sub
+    config.reload_if_changed()
+    sub = _ensure_path(config.data, ("agents", "defaults", "subagents"))
 
     model_cfg = _build_model_config(primary, fallbacks_csv)
     if model_cfg:
@@ -956,34 +1205,25 @@ def set_spawn_model_policy(primary: str, fallbacks_csv: str) -> bool:
     else:
         sub.pop("model", None)
     ok = config.save()
-    config.reload()
+    config.reload_if_changed()
     return ok
 
 
 def spawn_model_policy_menu():
     while True:
-        console.clear()
-        console.print(Panel(
-            Text("🧬 Spawn Agent 默认模型优先级", style="bold cyan", justify="center"),
-            box=box.DOUBLE
-        ))
         primary, fallbacks = get_spawn_model_policy()
-        console.print()
-        console.print("[bold]当前设置:[/]")
-        if primary:
-            console.print(f"  [yellow]主模型:[/] [green]{primary}[/]")
-        else:
-            console.print("  [yellow]主模型:[/] [dim](继承全局)[/]")
-        if fallbacks:
-            console.print(f"  [yellow]备用链:[/] [cyan]{' → '.join(fallbacks)}[/]")
-        else:
-            console.print("  [yellow]备用链:[/] [dim](继承全局)[/]")
-        console.print()
-        console.print("[bold]操作:[/]")
-        console.print("  [cyan]1[/] 设置/更新 Spawn 默认模型")
-        console.print("  [cyan]2[/] 清除 Spawn 覆盖（继承全局）")
-        console.print("  [cyan]0[/] 返回")
-        console.print()
+        console.clear()
+        render_screen(
+            console,
+            _HEADER_SPAWN_POLICY,
+            "",
+            "[bold]当前设置:[/]",
+            f"  [yellow]主模型:[/] [green]{primary}[/]" if primary else "  [yellow]主模型:[/] [dim](继承全局)[/]",
+            f"  [yellow]备用链:[/] [cyan]{' → '.join(fallbacks)}[/]" if fallbacks else "  [yellow]备用链:[/] [dim](继承全局)[/]",
+            "",
+            _SPAWN_POLICY_ACTIONS,
+            "",
+        )
         choice = Prompt.ask("[bold green]>[/]", choices=["0", "1", "2"], default="0")
         if choice == "0":
             return
@@ -1011,26 +1251,19 @@ def spawn_model_policy_menu():
 def global_model_policy_menu():
     """全局模型优先级菜单（统一主模型+备用链管理）。"""
     while True:
+        default_model, fallbacks = get_model_status()
         console.clear()
-        console.print(Panel(
-            Text("🌐 全局模型优先级", style="bold cyan", justify="center"),
-            box=box.DOUBLE
-        ))
-        console.print()
-        default_model = get_default_model()
-        fallbacks = get_fallbacks()
-        console.print("[bold]当前全局策略:[/]")
-        console.print(f"  [yellow]主模型:[/] [green]{default_model}[/]" if default_model else "  [yellow]主模型:[/] [dim](未设置)[/]")
-        if fallbacks:
-            console.print(f"  [yellow]备用链:[/] [cyan]{' → '.join(fallbacks)}[/]")
-        else:
-            console.print("  [yellow]备用链:[/] [dim](未设置)[/]")
-        console.print()
-        console.print("[bold]操作:[/]")
-        console.print("  [cyan]1[/] 设置全局主模型")
-        console.print("  [cyan]2[/] 设置全局备用链")
-        console.print("  [cyan]0[/] 返回")
-        console.print()
+        render_screen(
+            console,
+            _HEADER_GLOBAL_POLICY,
+            "",
+            "[bold]当前全局策略:[/]",
+            f"  [yellow]主模型:[/] [green]{default_model}[/]" if default_model else "  [yellow]主模型:[/] [dim](未设置)[/]",
+            f"  [yellow]备用链:[/] [cyan]{' → '.join(fallbacks)}[/]" if fallbacks else "  [yellow]备用链:[/] [dim](未设置)[/]",
+            "",
+            _GLOBAL_POLICY_ACTIONS,
+            "",
+        )
         choice = Prompt.ask("[bold green]>[/]", choices=["0", "1", "2"], default="0")
         if choice == "0":
             return
@@ -1040,15 +1273,51 @@ def global_model_policy_menu():
             _run_menu_action(manage_fallbacks_menu, "设置全局备用链")
 
 
+def _agent_table_rows(agent_rows: List[tuple]) -> tuple:
+    """先在纯 Python 中算好 Agent 表格各行与摘要计数，再交给 Rich 一次性渲染
+
+    返回 (rows, bound_count, bad_count, unbound_ids)。
+    """
+    rows = []
+    bound_count = 0
+    bad_count = 0
+    unbound = []
+    for a, aid, _, ws in agent_rows:
+        settings = _extract_agent_settings(a)
+        model_overridden = bool(settings["model_primary"] or settings["model_fallbacks"])
+        allow_agents = settings["allow_agents"] if isinstance(settings["allow_agents"], list) else []
+        if not allow_agents:
+            dispatch = "已关闭"
+        elif allow_agents == ["*"]:
+            dispatch = "已开启(全部)"
+        else:
+            dispatch = f"已开启(仅{len(allow_agents)}个Agent)"
+        health = _workspace_health(a)
+        if ws:
+            bound_count += 1
+        else:
+            unbound.append(aid)
+        if "目录不存在" in health or "缺关键文件" in health or "未绑定" in health:
+            bad_count += 1
+        rows.append((
+            aid,
+            _short_workspace(ws),
+            settings["access_label"],
+            settings["capability_label"],
+            _permission_summary(settings["permission_overrides"]),
+            "独立模型" if model_overridden else "跟随全局",
+            dispatch,
+            health,
+        ))
+    return rows, bound_count, bad_count, unbound
+
+
 def main_agent_settings_menu():
     def workspace_management_menu():
         while True:
             console.clear()
-            console.print(Panel(
-                Text("🗂️ 工作区管理", style="bold cyan", justify="center"),
-                box=box.DOUBLE
-            ))
-            config.reload()
+            console.print(_HEADER_WORKSPACES)
+            config.reload_if_changed()
             agents_local = _dispatch_manageable_agents()
             console.print()
             if not agents_local:
@@ -1073,7 +1342,7 @@ def main_agent_settings_menu():
                     continue
 
                 target = _agent_by_id(agent_id)
-                current_ws = str(target.get("workspace", "") or "").strip()
+                current_ws = _agent_workspace(target)
                 default_ws = current_ws if current_ws else os.path.join(_workspace_root_base(), "workspace")
                 workspace_path = Prompt.ask("[bold]请输入要绑定的 workspace 绝对路径（必须已存在）[/]", default=default_ws).strip()
                 ws_ok, ws_err = _validate_existing_workspace(workspace_path)
@@ -1087,16 +1356,16 @@ def main_agent_settings_menu():
                     agent_id=agent_id,
                     workspace_path=workspace_path,
                     model_primary=settings["model_primary"],
-                    model_fallbacks_csv=settings["model_fallbacks"],
+                    model_fallbacks=settings["model_fallbacks"],
                     allow_agents=settings["allow_agents"],
                     sub_model_primary=settings["sub_model_primary"],
-                    sub_model_fallbacks_csv=settings["sub_model_fallbacks"],
+                    sub_model_fallbacks=settings["sub_model_fallbacks"],
                     access_mode=settings["access_mode"],
                     capability_preset=settings["capability_preset"],
                     control_plane_capabilities=settings["control_caps"],
                 )
                 if ok:
-                    config.reload()
+                    config.reload_if_changed()
                     console.print(f"\n[green]✅ 已完成工作区绑定[/]")
                     console.print(f"  [dim]变更: Agent {agent_id}[/]")
                     console.print(f"  [dim]结果: workspace -> {workspace_path}[/]")
@@ -1112,7 +1381,7 @@ def main_agent_settings_menu():
                     console.print("[dim]请使用「1 手动绑定工作区」选择 Agent 和目录[/]")
                     pause_enter()
                     continue
-                unbound_agents = [a for a in agents_local if not str(a.get("workspace", "") or "").strip()]
+                unbound_agents = [a for a in agents_local if not _agent_workspace(a)]
                 target_agents = unbound_agents if unbound_agents else agents_local
                 if len(target_agents) == 1:
                     agent_id = str(target_agents[0].get("id", "") or "").strip()
@@ -1138,16 +1407,16 @@ def main_agent_settings_menu():
                     agent_id=agent_id,
                     workspace_path=workspace_path,
                     model_primary=settings["model_primary"],
-                    model_fallbacks_csv=settings["model_fallbacks"],
+                    model_fallbacks=settings["model_fallbacks"],
                     allow_agents=settings["allow_agents"],
                     sub_model_primary=settings["sub_model_primary"],
-                    sub_model_fallbacks_csv=settings["sub_model_fallbacks"],
+                    sub_model_fallbacks=settings["sub_model_fallbacks"],
                     access_mode=settings["access_mode"],
                     capability_preset=settings["capability_preset"],
                     control_plane_capabilities=settings["control_caps"],
                 )
                 if ok:
-                    config.reload()
+                    config.reload_if_changed()
                     console.print(f"\n[green]✅ 已完成自动绑定[/]")
                     console.print(f"  [dim]变更: Agent {agent_id}[/]")
                     console.print(f"  [dim]结果: workspace -> {workspace_path}[/]")
@@ -1159,12 +1428,10 @@ def main_agent_settings_menu():
 
     while True:
         console.clear()
-        console.print(Panel(
-            Text("🧭 Agent 与工作区", style="bold cyan", justify="center"),
-            box=box.DOUBLE
-        ))
-        config.reload()
-        agents = _dispatch_manageable_agents()
+        console.print(_HEADER_MAIN_AGENTS)
+        config.reload_if_changed()
+        agent_rows = _dispatch_manageable_rows()
+        agents = [r[0] for r in agent_rows]
         console.print()
         if agents:
             table = Table(box=box.SIMPLE)
@@ -1176,39 +1443,14 @@ def main_agent_settings_menu():
             table.add_column("模型策略", style="magenta")
             table.add_column("派发", style="green")
             table.add_column("健康", style="white")
-            bound_count = 0
-            bad_count = 0
-            for a in agents:
-                settings = _extract_agent_settings(a)
-                model_overridden = bool(settings["model_primary"] or settings["model_fallbacks"])
-                allow_agents = settings["allow_agents"] if isinstance(settings["allow_agents"], list) else []
-                if not allow_agents:
-                    dispatch = "已关闭"
-                elif allow_agents == ["*"]:
-                    dispatch = "已开启(全部)"
-                else:
-                    dispatch = f"已开启(仅{len(allow_agents)}个Agent)"
-                health = _workspace_health(a)
-                if str(a.get("workspace", "") or "").strip():
-                    bound_count += 1
-                if "目录不存在" in health or "缺关键文件" in health or "未绑定" in health:
-                    bad_count += 1
-                table.add_row(
-                    str(a.get("id", "")),
-                    _short_workspace(str(a.get("workspace", "(未绑定)"))),
-                    settings["access_label"],
-                    settings["capability_label"],
-                    _permission_summary(settings["permission_overrides"]),
-                    "独立模型" if model_overridden else "跟随全局",
-                    dispatch,
-                    health,
-                )
+            rows, bound_count, bad_count, unbound = _agent_table_rows(agent_rows)
+            for row in rows:
+                table.add_row(*row)
             console.print(table)
             console.print()
             console.print(
                 f"[dim]摘要: Agent {len(agents)} | 已绑定工作区 {bound_count} | 异常 {bad_count}[/]"
             )
-            unbound = [str(a.get("id", "")) for a in agents if not str(a.get("workspace", "") or "").strip()]
             if unbound:
                 console.print()
                 console.print(f"[yellow]⚠️ 未绑定 workspace: {', '.join(unbound)}[/]")
@@ -1276,10 +1518,10 @@ def main_agent_settings_menu():
                     agent_id=agent_id,
                     workspace_path=settings["workspace_path"],
                     model_primary=settings["model_primary"],
-                    model_fallbacks_csv=settings["model_fallbacks"],
+                    model_fallbacks=settings["model_fallbacks"],
                     allow_agents=settings["allow_agents"],
                     sub_model_primary=settings["sub_model_primary"],
-                    sub_model_fallbacks_csv=settings["sub_model_fallbacks"],
+                    sub_model_fallbacks=settings["sub_model_fallbacks"],
                     access_mode=access_mode,
                     capability_preset=capability_preset,
                     control_plane_capabilities=current_caps,
@@ -1361,10 +1603,10 @@ def main_agent_settings_menu():
                 "permission_overrides": {},
                 "control_caps": [],
                 "model_primary": "",
-                "model_fallbacks": "",
+                "model_fallbacks": [],
                 "allow_agents": [],
                 "sub_model_primary": "",
-                "sub_model_fallbacks": "",
+                "sub_model_fallbacks": [],
             }
 
         default_ws = existing_settings["workspace_path"] or _next_workspace_path(_get_agents_list())
@@ -1387,7 +1629,7 @@ def main_agent_settings_menu():
             permission_overrides={},
         )
         if ok:
-            config.reload()
+            config.reload_if_changed()
             effective_agent_id = created_agent_id or agent_id
             console.print(f"\n[green]✅ 已完成官方 Agent 创建[/]")
             console.print(f"  [dim]变更: Agent {effective_agent_id}[/]")
@@ -1404,15 +1646,12 @@ def main_agent_settings_menu():
 
 
 def agent_model_policy_menu():
+    frame = MenuFrame(console)
     while True:
-        console.clear()
-        console.print(Panel(
-            Text("🎯 Agent 模型优先级", style="bold cyan", justify="center"),
-            box=box.DOUBLE
-        ))
-        config.reload()
+        config.reload_if_changed()
         agents = _dispatch_manageable_agents()
         if not agents:
+            render_screen(console, _HEADER_AGENT_POLICY, clear=True)
             console.print("\n[yellow]⚠️ 暂无可配置的 Agent[/]")
             pause_enter()
             return
@@ -1425,123 +1664,138 @@ def agent_model_policy_menu():
             if settings["model_primary"] or settings["model_fallbacks"]:
                 val = settings["model_primary"] or "(仅备选)"
                 if settings["model_fallbacks"]:
-                    val = f"{val} | {' -> '.join([x for x in settings['model_fallbacks'].split(',') if x])}"
+                    val = f"{val} | {' -> '.join([x for x in settings['model_fallbacks'] if x])}"
                 table.add_row(str(a.get("id", "")), f"[green]覆盖[/] {val}")
             else:
                 table.add_row(str(a.get("id", "")), "[dim]继承全局[/]")
-        console.print()
-        console.print(table)
-        console.print()
-        console.print("[bold]操作:[/]")
-        console.print("  [cyan]1[/] 设置/更新 Agent 覆盖策略")
-        console.print("  [cyan]2[/] 清除 Agent 覆盖（继承全局）")
-        console.print("  [cyan]0[/] 返回")
-        console.print()
+        frame.draw(
+            _HEADER_AGENT_POLICY,
+            "",
+            table,
+            "",
+            "[bold]操作:[/]",
+            "  [cyan]1[/] 设置/更新 Agent 覆盖策略",
+            "  [cyan]2[/] 清除 Agent 覆盖（继承全局）",
+            "  [cyan]0[/] 返回",
+            "",
+        )
         choice = Prompt.ask("[bold green]>[/]", choices=["0", "1", "2"], default="0")
         if choice == "0":
             return
 
-        ids = [str(a.get("id", "")) for a in agents if str(a.get("id", ""))]
-        agent_id = _select_agent_id(ids, title="请选择 Agent", default_id=ids[0])
-        if not agent_id:
-            console.print("\n[yellow]⚠️ 已取消选择[/]")
-            pause_enter()
-            continue
+        with frame.away():
+            ids = [str(a.get("id", "")) for a in agents if str(a.get("id", ""))]
+            agent_id = _select_agent_id(ids, title="请选择 Agent", default_id=ids[0])
+            if not agent_id:
+                console.print("\n[yellow]⚠️ 已取消选择[/]")
+                pause_enter()
+                continue
 
-        target = _agent_by_id(agent_id)
-        settings = _extract_agent_settings(target)
-        if not settings["workspace_path"]:
-            console.print("\n[yellow]⚠️ 该 Agent 未绑定 workspace，无法设置覆盖策略[/]")
-            pause_enter()
-            continue
+            target = _agent_by_id(agent_id)
+            settings = _extract_agent_settings(target)
+            if not settings["workspace_path"]:
+                console.print("\n[yellow]⚠️ 该 Agent 未绑定 workspace，无法设置覆盖策略[/]")
+                pause_enter()
+                continue
 
-        if choice == "2":
-            ok = clear_agent_model_policy(agent_id)
-            console.print("\n[green]✅ 已清除 Agent 覆盖策略[/]" if ok else "\n[bold red]❌ 清除失败[/]")
+            if choice == "2":
+                ok = clear_agent_model_policy(agent_id)
+                console.print("\n[green]✅ 已清除 Agent 覆盖策略[/]" if ok else "\n[bold red]❌ 清除失败[/]")
+                pause_enter()
+                continue
+
+            primary = pick_model_from_catalog(
+                title="选择 Agent 主模型",
+                default_model=settings["model_primary"],
+                allow_empty=True,
+            )
+            fallbacks = pick_fallbacks_from_catalog(
+                title="选择 Agent 备选模型",
+                default_csv=",".join(settings["model_fallbacks"]),
+                exclude_model=primary,
+            )
+            ok = set_agent_model_policy(agent_id, primary, fallbacks)
+            console.print("\n[green]✅ 已更新 Agent 模型覆盖策略[/]" if ok else "\n[bold red]❌ 更新失败[/]")
             pause_enter()
-            continue
 
-        primary = pick_model_from_catalog(
-            title="选择 Agent 主模型",
-            default_model=settings["model_primary"],
-            allow_empty=True,
-        )
-        fallbacks = pick_fallbacks_from_catalog(
-            title="选择 Agent 备选模型",
-            default_csv=settings["model_fallbacks"],
-            exclude_model=primary,
-        )
-        ok = set_agent_model_policy(agent_id, primary, fallbacks)
-        console.print("\n[green]✅ 已更新 Agent 模型覆盖策略[/]" if ok else "\n[bold red]❌ 更新失败[/]")
-        pause_enter()
+
+def _routing_state() -> tuple:
+    """返回任务指派首页状态 (default_model, fallbacks, sub_status)。
+
+    模型状态复用 _get_model_status 自身的缓存（仅未命中时显示加载提示）；
+    子 Agent 状态只解析内存中的配置，按 config.generation 缓存，二者互不牵连。
+    """
+    config.reload_if_changed()
+    status = _model_status_hit(_config_file_version())
+    if status is None:
+        with console.status("[yellow]⏳ 正在获取当前状态...[/]"):
+            status = _get_model_status(False)
+    default_model, fallbacks = status
+
+    cache = _ROUTING_STATE_CACHE
+    if cache["generation"] != config.generation:
+        cache.update(generation=config.generation, sub_status=config.get_subagent_status())
+    return default_model, fallbacks, cache["sub_status"]
+
 
 def menu_routing():
     """任务指派主菜单"""
+    frame = MenuFrame(console)
     while True:
-        console.clear()
-        console.print()
-        console.print("[bold cyan]========== 🤖 任务指派 (Routing) ==========[/]")
-        console.print()
-        
-        # 小贴士
-        console.print(Panel(
-            Text("💡 在这里设置你的默认模型和备选链，OpenClaw 会自动切换", 
-                 style="dim", justify="center"),
-            box=box.ROUNDED,
-            border_style="blue"
-        ))
-        
-        # 获取当前状态
-        with console.status("[yellow]⏳ 正在获取当前状态...[/]"):
-            default_model = get_default_model()
-            fallbacks = get_fallbacks()
-            sub_status = config.get_subagent_status()
-        
-        # 显示当前配置
-        console.print()
-        console.print(Panel(
-            Text("当前配置", style="bold", justify="center"),
-            box=box.DOUBLE
-        ))
-        
-        console.print()
-        if default_model:
-            console.print(f"  [bold]🌟 首选模型:[/] [green]{default_model}[/]")
-        else:
-            console.print(f"  [bold]🌟 首选模型:[/] [yellow](未设置)[/]")
-        
-        if fallbacks:
-            console.print(f"  [bold]🔄 备选链:[/] [cyan]{' → '.join(fallbacks)}[/]")
-        else:
-            console.print(f"  [bold]🔄 备选链:[/] [dim](未设置)[/]")
-        
+        # 获取当前状态（配置未变化时复用上次结果）
+        default_model, fallbacks, sub_status = _routing_state()
+
         sub_str = "[green]✅ 已启用[/]" if sub_status["enabled"] else "[red]❌ 已禁用[/]"
-        console.print(f"  [bold]👥 子 Agent:[/] {sub_str} (并发上限: {sub_status['maxConcurrent']})")
-        
-        console.print()
-        console.print("[bold]操作:[/]")
-        console.print("  [cyan]1[/] 设置首选模型")
-        console.print("  [cyan]2[/] 管理备选链")
-        console.print("  [cyan]3[/] Agent派发管理")
-        console.print("  [cyan]4[/] 主 Agent 管理")
-        console.print("  [cyan]0[/] 返回")
-        console.print()
+        # 整屏内容在内存中渲染；与屏幕上的上一帧相同时不重绘
+        frame.draw(
+            "",
+            _ROUTING_HEADER,
+            "",
+            # 小贴士
+            _TIP_ROUTING,
+            # 显示当前配置
+            "",
+            _HEADER_CONFIG,
+            "",
+            Text.assemble(
+                ("  🌟 首选模型:", "bold"),
+                " ",
+                (default_model, "green") if default_model else ("(未设置)", "yellow"),
+            ),
+            Text.assemble(
+                ("  🔄 备选链:", "bold"),
+                " ",
+                (" → ".join(fallbacks), "cyan") if fallbacks else ("(未设置)", "dim"),
+            ),
+            f"  [bold]👥 子 Agent:[/] {sub_str} (并发上限: {sub_status['maxConcurrent']})",
+            "",
+            _ROUTING_ACTIONS,
+            "",
+        )
         
         # 接受大小写
         choice = Prompt.ask("[bold green]>[/]", default="0").strip().lower()
         while choice not in ["0", "1", "2", "3", "4"]:
+            # 无效输入只清除提示行，菜单不重绘
+            frame.retry_prompt()
             choice = Prompt.ask("[bold green]>[/]", default="0").strip().lower()
         
         if choice == "0":
             break
-        elif choice == "1":
-            _run_menu_action(set_default_model_menu, "设置首选模型")
-        elif choice == "2":
-            _run_menu_action(manage_fallbacks_menu, "管理备选链")
-        elif choice == "3":
-            _run_menu_action(subagent_settings_menu, "Agent 派发管理")
-        elif choice == "4":
-            _run_menu_action(main_agent_settings_menu, "主 Agent 管理")
+        with frame.away(keep_menu=False):
+            if choice == "1":
+                _run_menu_action(set_default_model_menu, "设置首选模型")
+            elif choice == "2":
+                _run_menu_action(manage_fallbacks_menu, "管理备选链")
+            elif choice == "3":
+                _run_menu_action(subagent_settings_menu, "Agent 派发管理")
+            elif choice == "4":
+                _run_menu_action(main_agent_settings_menu, "主 Agent 管理")
+
+
+def get_model_status() -> tuple:
+    """一次取回 (默认模型, 备选链)，需要两者时避免分别调用两个 getter"""
+    return _get_model_status()
 
 
 def get_default_model() -> Optional[str]:
@@ -1562,31 +1816,61 @@ def _extract_model_cfg(model_cfg) -> tuple:
         return model_cfg.strip() or None, []
     if isinstance(model_cfg, dict):
         primary = str(model_cfg.get("primary", "") or "").strip() or None
-        raw = model_cfg.get("fallbacks", [])
-        fallbacks = [str(x).strip() for x in raw if str(x).strip()] if isinstance(raw, list) else []
-        return primary, fallbacks
+        raw = model_cfg.get("fallbacks")
+        if not isinstance(raw, list):
+            return primary, []
+        # 每项只做一次 str()/strip()（已是干净字符串时 strip 直接返回原对象）
+        return primary, [x for x in (str(item).strip() for item in raw) if x]
     return None, []
 
 
-def _get_model_status() -> tuple:
-    """读取首页模型状态，优先本地配置（毫秒级），必要时降级 CLI"""
-    now = time.time()
-    if now - float(_MODEL_STATUS_CACHE.get("ts", 0.0)) < 2.0:
-        return _MODEL_STATUS_CACHE.get("default"), list(_MODEL_STATUS_CACHE.get("fallbacks", []))
+def _get_model_status(reload: bool = True) -> tuple:
+    """读取首页模型状态，优先本地配置（毫秒级），必要时降级 CLI
 
+    reload=False 时复用调用方已加载的 config.data，避免重复解析配置文件。
+    缓存在 TTL 内且配置文件未变化时直接返回；整个缓存为一个元组，读写均为单次引用操作。
+    """
+    current_version = _config_file_version()
+    hit = _model_status_hit(current_version)
+    if hit is not None:
+        return hit
+
+    # 同一时刻只允许一次加载（可能是 CLI 子进程）；等锁的调用方直接复用其结果
+    with _MODEL_STATUS_LOCK:
+        hit = _model_status_hit(current_version)
+        if hit is not None:
+            return hit
+        generation = _MODEL_STATUS_CACHE[0]
+        primary, fallbacks = _read_model_status(reload)
+        _store_model_status(generation, time.time(), current_version, primary, fallbacks)
+    return primary, list(fallbacks)
+
+
+def _model_status_hit(current_version: tuple) -> Optional[tuple]:
+    _, ts, version, default, fallbacks = _MODEL_STATUS_CACHE
+    if ts and time.time() - ts < MODEL_STATUS_TTL and version == current_version:
+        return default, list(fallbacks)
+    return None
+
+
+def _store_model_status(generation: int, ts: float, version: tuple, primary, fallbacks: List[str]):
+    """写回缓存；读取期间若已被失效（代数变化）则丢弃本次结果"""
+    global _MODEL_STATUS_CACHE
+    if _MODEL_STATUS_CACHE[0] == generation:
+        _MODEL_STATUS_CACHE = (generation, ts, version, primary, fallbacks)
+
+
+def _read_model_status(reload: bool) -> tuple:
     try:
-        config.reload()
+        if reload:
+            config.reload_if_changed()
         defaults_model = config.get("agents.defaults.model", None)
         if defaults_model is not None:
-            primary, fallbacks = _extract_model_cfg(defaults_model)
-            _MODEL_STATUS_CACHE.update({"ts": now, "default": primary, "fallbacks": fallbacks})
-            return primary, fallbacks
+            return _extract_model_cfg(defaults_model)
 
-        for a in config.get("agents.list", []) or []:
-            if isinstance(a, dict) and a.get("id") == "main":
-                primary, fallbacks = _extract_model_cfg(a.get("model"))
-                _MODEL_STATUS_CACHE.update({"ts": now, "default": primary, "fallbacks": fallbacks})
-                return primary, fallbacks
+        main_agent = _agent_by_id("main")
+        if main_agent:
+            return _extract_model_cfg(main_agent.get("model"))
     except Exception:
         pass
 
@@ -1598,59 +1882,129 @@ def _get_model_status() -> tuple:
             fallbacks = data.get("fallbacks", [])
             if not isinstance(fallbacks, list):
                 fallbacks = []
-            _MODEL_STATUS_CACHE.update({"ts": now, "default": primary, "fallbacks": fallbacks})
             return primary, fallbacks
     except Exception:
         pass
 
-    _MODEL_STATUS_CACHE.update({"ts": now, "default": None, "fallbacks": []})
     return None, []
 
 
 def _load_model_catalog() -> List[dict]:
-    config.reload()
-    return config.get_all_models_flat()
+    return _cached_model_catalog()[0]
+
+
+# 模型目录缓存：generation 为加载时的 config.generation（文件变化会触发重新加载并递增）
+_MODEL_CATALOG_CACHE = {"generation": None, "models": [], "grouped": []}
+
+
+def _invalidate_model_catalog_cache():
+    _MODEL_CATALOG_CACHE["generation"] = None
+
+
+def _config_file_version() -> tuple:
+    """配置文件版本指纹 (mtime_ns, size)；文件不存在时返回空元组。"""
+    try:
+        st = os.stat(config.path)
+    except OSError:
+        return ()
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _model_provider(full_name: str) -> str:
+    return full_name.split("/", 1)[0] if "/" in full_name else "其他"
+
+
+def _group_models_by_provider(models: List[dict]) -> List[tuple]:
+    """按服务商分组，返回 [(provider, [(序号, model), ...]), ...]（服务商有序）。"""
+    numbered = [
+        (m.get("provider") or _model_provider(m["full_name"]), i, m)
+        for i, m in enumerate(models, 1)
+    ]
+    # 稳定排序：同一服务商内保持原序号顺序
+    numbered.sort(key=lambda x: x[0])
+    return [
+        (provider, [(i, m) for _, i, m in entries])
+        for provider, entries in groupby(numbered, key=lambda x: x[0])
+    ]
+
+
+def _model_group_lines(grouped: List[tuple], default_model: Optional[str] = None) -> List[str]:
+    """按服务商分组的模型列表行；传入 default_model 时带标记列（当前值加 ⭐）。"""
+    lines = []
+    for provider, entries in grouped:
+        lines.append(f"  [bold][cyan]{provider}[/][/]:")
+        if default_model is not None:
+            for idx, m in entries:
+                mark = "⭐ " if m["full_name"] == default_model else "   "
+                lines.append(f"    {mark}[{idx}] {m['display']}")
+        else:
+            lines.extend(f"    [{idx}] {m['display']}" for idx, m in entries)
+    return lines
+
+
+def _filter_model_catalog(all_models: List[dict], grouped: List[tuple], exclude: set) -> tuple:
+    """从缓存的目录/分组中剔除 exclude，返回 (剩余列表, 分组)；编号按剩余列表重排，无需重新分组排序。"""
+    available: List[dict] = []
+    new_index: Dict[int, int] = {}
+    for m in all_models:
+        if m["full_name"] not in exclude:
+            available.append(m)
+            new_index[id(m)] = len(available)
+    filtered = []
+    for provider, entries in grouped:
+        kept = [(new_index[id(m)], m) for _, m in entries if id(m) in new_index]
+        if kept:
+            filtered.append((provider, kept))
+    return available, filtered
+
+
+def _cached_model_catalog() -> tuple:
+    """返回 (模型扁平列表, 服务商分组)，仅在配置变化时重新展开与分组（返回值勿修改）。"""
+    config.reload_if_changed()
+    if _MODEL_CATALOG_CACHE["generation"] != config.generation:
+        models = config.get_all_models_flat()
+        for m in models:
+            m["provider"] = _model_provider(m["full_name"])
+        _MODEL_CATALOG_CACHE.update({
+            "generation": config.generation,
+            "models": models,
+            "grouped": _group_models_by_provider(models),
+        })
+    return _MODEL_CATALOG_CACHE["models"], _MODEL_CATALOG_CACHE["grouped"]
 
 
 def pick_model_from_catalog(title: str, default_model: str = "", allow_empty: bool = True) -> str:
-    all_models = _load_model_catalog()
+    all_models, grouped = _cached_model_catalog()
     if not all_models:
         console.print("\n[yellow]⚠️ 当前无可选模型，请先在资源库激活模型[/]")
         pause_enter()
         return default_model or ""
 
-    index_by_name = {m["full_name"]: i + 1 for i, m in enumerate(all_models)}
-    default_idx = str(index_by_name.get(default_model, 0))
+    default_idx = next(
+        (str(i) for i, m in enumerate(all_models, 1) if m["full_name"] == default_model),
+        "0",
+    )
+
+    # 目录、当前值在本次选择期间不变：整屏内容与可选编号只构建一次
+    screen = [title_panel(title), ""]
+    if default_model:
+        screen.append(f"[dim]当前值: {default_model}[/]")
+    elif allow_empty:
+        screen.append("[dim]当前值: (空)[/]")
+    screen += _model_group_lines(grouped, default_model or "")
+    screen.append("")
+    if allow_empty:
+        screen.append("  [cyan]0[/] 设为空")
+    screen.append("  [cyan]q[/] 保持当前值并返回")
+    choices = [str(i) for i in range(1, len(all_models) + 1)] + ["q"]
+    if allow_empty:
+        choices = ["0"] + choices
+    prompt_default = default_idx if default_idx != "0" else ("0" if allow_empty else "q")
 
     while True:
         console.clear()
-        console.print(Panel(Text(title, style="bold cyan", justify="center"), box=box.DOUBLE))
-        console.print()
-        if default_model:
-            console.print(f"[dim]当前值: {default_model}[/]")
-        elif allow_empty:
-            console.print("[dim]当前值: (空)[/]")
-
-        from collections import defaultdict
-        grouped = defaultdict(list)
-        for i, m in enumerate(all_models, 1):
-            provider = m["full_name"].split("/", 1)[0] if "/" in m["full_name"] else "其他"
-            grouped[provider].append((i, m))
-
-        for provider in sorted(grouped.keys()):
-            console.print(f"  [bold][cyan]{provider}[/][/]:")
-            for idx, m in grouped[provider]:
-                mark = "⭐ " if m["full_name"] == default_model else "   "
-                console.print(f"    {mark}[{idx}] {m['display']}")
-
-        console.print()
-        if allow_empty:
-            console.print("  [cyan]0[/] 设为空")
-        console.print("  [cyan]q[/] 保持当前值并返回")
-        choices = [str(i) for i in range(1, len(all_models) + 1)] + ["q"]
-        if allow_empty:
-            choices = ["0"] + choices
-        choice = Prompt.ask("[bold green]>[/]", choices=choices, default=(default_idx if default_idx != "0" else ("0" if allow_empty else "q")))
+        render_screen(console, *screen)
+        choice = Prompt.ask("[bold green]>[/]", choices=choices, default=prompt_default)
         if choice == "q":
             return default_model or ""
         if choice == "0":
@@ -1667,157 +2021,195 @@ def pick_fallbacks_from_catalog(title: str, default_csv: str = "", exclude_model
         return ",".join(selected)
 
     candidates = [m for m in all_models if m["full_name"] != exclude_model]
-    index_map = {str(i + 1): m["full_name"] for i, m in enumerate(candidates)}
-    default_indexes = [k for k, v in index_map.items() if v in selected]
+    selected_set = set(selected)
+    raw_default = ",".join(str(i) for i, m in enumerate(candidates, 1) if m["full_name"] in selected_set)
+
+    # 已选状态在输入有效前不变：整屏内容只构建一次，输入无效时直接重绘
+    screen = [
+        title_panel(title),
+        "",
+        f"[dim]当前值: {', '.join(selected) if selected else '(空)'}[/]",
+        "[dim]输入规则: 多选请用逗号，如 1,3,8；输入 q 保持当前值[/]",
+        "",
+    ]
+    screen += [
+        f"  [{i}] {'✅' if m['full_name'] in selected_set else '⬜'} {m['display']}"
+        for i, m in enumerate(candidates, 1)
+    ]
 
     while True:
         console.clear()
-        console.print(Panel(Text(title, style="bold cyan", justify="center"), box=box.DOUBLE))
-        console.print()
-        console.print(f"[dim]当前值: {', '.join(selected) if selected else '(空)'}[/]")
-        console.print("[dim]输入规则: 多选请用逗号，如 1,3,8；输入 q 保持当前值[/]")
-        console.print()
-        for i, m in enumerate(candidates, 1):
-            mark = "✅" if m["full_name"] in selected else "⬜"
-            console.print(f"  [{i}] {mark} {m['display']}")
-        raw_default = ",".join(default_indexes) if default_indexes else ""
+        render_screen(console, *screen)
         raw = Prompt.ask("[bold green]选择编号[/]", default=raw_default).strip()
         if raw.lower() == "q":
             return ",".join(selected)
         if not raw:
             return ""
-        parts = [x.strip() for x in raw.split(",") if x.strip()]
-        if not all(p.isdigit() and p in index_map for p in parts):
+        picked = _parse_index_list(raw, len(candidates))
+        if picked is None:
             console.print("\n[bold red]❌ 输入无效，请用编号列表（如 1,2,5）[/]")
             pause_enter()
             continue
-        chosen = [index_map[p] for p in parts]
-        # 去重且保持顺序
-        seen = set()
-        ordered = []
-        for x in chosen:
-            if x not in seen:
-                seen.add(x)
-                ordered.append(x)
-        return ",".join(ordered)
+        return ",".join(candidates[i - 1]["full_name"] for i in picked)
+
+
+def _ask_model_index(count: int) -> int:
+    """读取 0..count 的编号（整数解析 + 范围校验，无需构造完整 choices 列表）"""
+    while True:
+        raw = Prompt.ask("[bold green]>[/]", default="0").strip()
+        try:
+            idx = int(raw)
+        except ValueError:
+            idx = -1
+        if 0 <= idx <= count:
+            return idx
+        console.print(f"[bold red]❌ 无效输入，请输入 0-{count} 的编号[/]")
+
+
+def _parse_index_list(raw: str, count: int) -> Optional[List[int]]:
+    """解析逗号分隔的编号列表（1..count，去重保序）；含非法项时返回 None"""
+    picked: List[int] = []
+    for part in raw.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if not part.isdigit():
+            return None
+        idx = int(part)
+        if not 1 <= idx <= count:
+            return None
+        picked.append(idx)
+    # dict 保持插入顺序：一次调用完成去重保序
+    return list(dict.fromkeys(picked))
+
+
+def _ask_model_indexes(count: int) -> List[int]:
+    """读取一个或多个编号（逗号分隔）；输入 0 返回空列表"""
+    while True:
+        raw = Prompt.ask("[bold green]>[/]", default="0").strip()
+        if raw == "0":
+            return []
+        picked = _parse_index_list(raw, count)
+        if picked:
+            return picked
+        console.print(f"[bold red]❌ 无效输入，请输入 1-{count} 的编号（多个用逗号分隔）或 0 返回[/]")
 
 
 def set_default_model_menu():
     """设置首选模型菜单"""
     while True:
         console.clear()
-        console.print(Panel(
-            Text("🌟 设置首选模型", style="bold cyan", justify="center"),
-            box=box.DOUBLE
-        ))
-        
-        # 小贴士
-        console.print()
-        console.print("  [dim]💡 首选模型是 OpenClaw 优先使用的模型[/]")
-        console.print()
+        header = [
+            _HEADER_SET_DEFAULT,
+            # 小贴士
+            "",
+            _TIPS_SET_DEFAULT,
+            "",
+        ]
         
-        # 获取所有可用模型
+        # 获取所有可用模型（配置未变化时复用缓存）
         try:
-            config.reload()
-            all_models = config.get_all_models_flat()
+            all_models, models_by_provider = _cached_model_catalog()
         except Exception as e:
+            render_screen(console, *header)
             console.print(f"\n[bold red]❌ 获取模型列表失败: {e}[/]")
             pause_enter()
             return
         
         if not all_models:
+            render_screen(console, *header)
             console.print("\n[yellow]⚠️ 资源库中无可用模型，请先在「资源库」中激活模型[/]")
             pause_enter()
             return
         
-        console.print()
-        console.print("[bold]可选模型（按服务商分组）:[/]")
-        console.print()
-        
-        # 按服务商分组
-        from collections import defaultdict
-        models_by_provider = defaultdict(list)
-        for i, m in enumerate(all_models, 1):
-            if "/" in m['full_name']:
-                provider = m['full_name'].split("/", 1)[0]
-            else:
-                provider = "其他"
-            models_by_provider[provider].append((i, m))
+        screen = header + ["", "[bold]可选模型（按服务商分组）:[/]", ""]
         
-        # 显示
-        for provider in sorted(models_by_provider.keys()):
-            console.print(f"  [bold][cyan]{provider}[/][/]:")
-            for idx, m in models_by_provider[provider]:
-                console.print(f"    [{idx}] {m['display']}")
+        # 显示（按服务商分组）
+        screen += _model_group_lines(models_by_provider)
         
-        console.print()
-        console.print("[cyan]0[/] 返回")
-        console.print()
+        screen += ["", "[cyan]0[/] 返回", ""]
+        render_screen(console, *screen)
         
-        choices = ["0"] + [str(i) for i in range(1, len(all_models) + 1)]
-        choice = Prompt.ask("[bold green]>[/]", choices=choices, default="0")
+        choice = _ask_model_index(len(all_models))
         
-        if choice == "0":
+        if choice == 0:
             break
-        elif choice.isdigit():
-            idx = int(choice) - 1
-            if 0 <= idx < len(all_models):
-                model = all_models[idx]['full_name']
-                set_default_model(model)
+        model = all_models[choice - 1]['full_name']
+        set_default_model(model)
 
 
-def set_default_model(model: str):
-    """设置默认模型（使用 CLI，错误提示友好化）"""
-    console.print(f"\n[yellow]⏳ 正在设置首选模型: {model}...[/]")
+def _apply_models_cli(args: List[str], success_msg: str, fail_label: str, *, session_backup: bool = True) -> bool:
+    """执行一次写配置的 models CLI：备份 → 调用 → 成功时失效缓存并提示（错误提示友好化）
+
+    session_backup=True 时复用备选链管理会话内的备份，否则直接备份当前配置。
+    """
     try:
-        # 先手动备份配置
-        config.reload()
-        backup_path = config.backup()
-        if backup_path:
-            console.print(f"  [dim]💡 已备份配置到: {backup_path}[/]")
+        if session_backup:
+            # 本次备选链管理会话内只备份一次配置
+            _backup_config_for_fallback_session()
+        else:
+            # 按路径复制文件，无需先重新加载
+            backup_path = config.backup()
+            if backup_path:
+                console.print(f"  [dim]💡 已备份配置到: {backup_path}[/]")
         
-        stdout, stderr, code = run_cli(["models", "set", model])
+        stdout, stderr, code = run_cli(args)
         
         if code == 0:
             _invalidate_model_status_cache()
-            console.print(f"\n[green]✅ 已设置首选模型: {model}[/]")
+            _invalidate_model_catalog_cache()
+            console.print(f"\n[green]✅ {success_msg}[/]")
             console.print("\n[dim]💡 此更改热生效，无需重启服务[/]")
-        else:
-            console.print(f"\n[bold red]❌ 设置失败[/]")
-            if stderr:
-                console.print(f"  [dim]详情: {stderr}[/]")
+            return True
+        console.print(f"\n[bold red]❌ {fail_label}失败[/]")
+        if stderr:
+            console.print(f"  [dim]详情: {stderr}[/]")
     except Exception as e:
-        console.print(f"\n[bold red]❌ 设置失败: {e}[/]")
-    
+        console.print(f"\n[bold red]❌ {fail_label}失败: {e}[/]")
         pause_enter()
+    return False
+
+
+def set_default_model(model: str):
+    """设置默认模型（使用 CLI，错误提示友好化）"""
+    console.print(f"\n[yellow]⏳ 正在设置首选模型: {model}...[/]")
+    _apply_models_cli(["models", "set", model], f"已设置首选模型: {model}", "设置", session_backup=False)
+
+
+def _backup_config_for_fallback_session():
+    """备选链管理会话内首次修改前备份配置，之后的修改复用该备份"""
+    if _FALLBACK_SESSION["backup"]:
+        return
+    backup_path = config.backup()
+    if backup_path:
+        _FALLBACK_SESSION["backup"] = backup_path
+        console.print(f"  [dim]💡 已备份配置到: {backup_path}[/]")
 
 
 def manage_fallbacks_menu():
     """管理备选链菜单"""
+    _FALLBACK_SESSION["backup"] = None
+    frame = MenuFrame(console)
     while True:
-        console.clear()
-        console.print(Panel(
-            Text("🔄 管理备选链", style="bold cyan", justify="center"),
-            box=box.DOUBLE
-        ))
-        
-        # 小贴士
-        console.print()
-        console.print("  [dim]💡 备选链是当首选模型不可用时，OpenClaw 会依次尝试的模型[/]")
-        console.print("  [dim]   支持多层备选：首选 → 备选1 → 备选2 → ...[/]")
-        console.print("  [dim]⚠️  目前 OpenClaw 官方 CLI 仅支持追加到末尾，暂不支持插入或重新排序[/]")
-        console.print()
+        screen = [
+            _HEADER_FALLBACKS,
+            # 小贴士
+            "",
+            _TIPS_FALLBACKS,
+            "",
+        ]
         
         try:
             fallbacks = get_fallbacks()
         except Exception as e:
+            render_screen(console, *screen, clear=True)
             console.print(f"\n[bold red]❌ 获取备选链失败: {e}[/]")
             pause_enter()
             return
         
-        console.print()
+        screen.append("")
         if fallbacks:
-            console.print("[bold]当前备选链:[/]")
+            screen.append("[bold]当前备选链:[/]")
             table = Table(box=box.SIMPLE)
             table.add_column("顺序", style="cyan", width=6)
             table.add_column("模型", style="bold")
@@ -1825,118 +2217,89 @@ def manage_fallbacks_menu():
             for i, model in enumerate(fallbacks, 1):
                 table.add_row(f"#{i}", model)
             
-            console.print(table)
+            screen.append(table)
         else:
-            console.print("[bold]当前备选链:[/] [yellow](未设置)[/]")
+            screen.append("[bold]当前备选链:[/] [yellow](未设置)[/]")
         
-        console.print()
-        console.print("[bold]操作:[/]")
-        console.print("  [cyan]1[/] 添加备选模型")
-        console.print("  [cyan]2[/] 移除备选模型")
-        console.print("  [cyan]3[/] 清空备选链")
-        console.print("  [cyan]0[/] 返回")
-        console.print()
+        screen += [
+            "",
+            _FALLBACK_ACTIONS,
+            "",
+        ]
+        frame.draw(*screen)
         
         choice = Prompt.ask("[bold green]>[/]", choices=["0", "1", "2", "3"], default="0")
         
         if choice == "0":
             break
-        elif choice == "1":
-            add_fallback_menu()
-        elif choice == "2":
-            remove_fallback_menu()
-        elif choice == "3":
-            clear_fallbacks_menu()
+        # 添加菜单自行清屏；移除/清空可能在菜单下方直接提示
+        with frame.away(keep_menu=choice != "1"):
+            if choice == "1":
+                add_fallback_menu()
+            elif choice == "2":
+                remove_fallback_menu()
+            elif choice == "3":
+                clear_fallbacks_menu()
 
 
 def add_fallback_menu():
     """添加备选模型菜单"""
-    while True:
-        console.clear()
-        console.print(Panel(
-            Text("➕ 添加备选模型", style="bold cyan", justify="center"),
-            box=box.DOUBLE
-        ))
-        
-        try:
-            # 获取所有可用模型
-            config.reload()
-            all_models = config.get_all_models_flat()
-            current_fallbacks = set(get_fallbacks())
-            
-            # 过滤掉已在备选链中的模型
-            available_models = [m for m in all_models if m['full_name'] not in current_fallbacks]
-        except Exception as e:
-            console.print(f"\n[bold red]❌ 获取模型列表失败: {e}[/]")
-            pause_enter()
-            return
-        
-        if not available_models:
-            console.print("\n[yellow]⚠️ 没有更多可用模型可添加[/]")
-            pause_enter()
-            return
-        
-        console.print()
-        console.print("[bold]可选模型（按服务商分组）:[/]")
-        console.print()
-        
-        # 按服务商分组
-        from collections import defaultdict
-        models_by_provider = defaultdict(list)
-        for i, m in enumerate(available_models, 1):
-            if "/" in m['full_name']:
-                provider = m['full_name'].split("/", 1)[0]
-            else:
-                provider = "其他"
-            models_by_provider[provider].append((i, m))
-        
-        # 显示
-        for provider in sorted(models_by_provider.keys()):
-            console.print(f"  [bold][cyan]{provider}[/][/]:")
-            for idx, m in models_by_provider[provider]:
-                console.print(f"    [{idx}] {m['display']}")
-        
-        console.print()
-        console.print("[cyan]0[/] 返回")
-        console.print()
-        
-        choices = ["0"] + [str(i) for i in range(1, len(available_models) + 1)]
-        choice = Prompt.ask("[bold green]>[/]", choices=choices, default="0")
-        
-        if choice == "0":
-            break
-        elif choice.isdigit():
-            idx = int(choice) - 1
-            if 0 <= idx < len(available_models):
-                model = available_models[idx]['full_name']
-                add_fallback(model)
-                break
-
-
-def add_fallback(model: str):
-    """添加备选模型（使用 CLI，错误提示友好化）"""
-    console.print(f"\n[yellow]⏳ 正在添加备选模型: {model}...[/]")
+    # 输入在 _ask_model_indexes 内校验，本菜单只绘制一次：候选列表与分组在进入时算好即可
+    console.clear()
+    screen = [
+        _HEADER_ADD_FALLBACK,
+    ]
+    
     try:
-        # 先手动备份配置
-        config.reload()
-        backup_path = config.backup()
-        if backup_path:
-            console.print(f"  [dim]💡 已备份配置到: {backup_path}[/]")
-        
-        stdout, stderr, code = run_cli(["models", "fallbacks", "add", model])
+        # 获取所有可用模型（配置未变化时复用缓存）
+        all_models, grouped = _cached_model_catalog()
+        current_fallbacks = set(get_fallbacks())
         
-        if code == 0:
-            _invalidate_model_status_cache()
-            console.print(f"\n[green]✅ 已添加备选模型: {model}[/]")
-            console.print("\n[dim]💡 此更改热生效，无需重启服务[/]")
-        else:
-            console.print(f"\n[bold red]❌ 添加失败[/]")
-            if stderr:
-                console.print(f"  [dim]详情: {stderr}[/]")
+        # 过滤掉已在备选链中的模型（沿用缓存分组）
+        available_models, available_grouped = _filter_model_catalog(all_models, grouped, current_fallbacks)
     except Exception as e:
-        console.print(f"\n[bold red]❌ 添加失败: {e}[/]")
+        render_screen(console, *screen)
+        console.print(f"\n[bold red]❌ 获取模型列表失败: {e}[/]")
+        pause_enter()
+        return
     
+    if not available_models:
+        render_screen(console, *screen)
+        console.print("\n[yellow]⚠️ 没有更多可用模型可添加[/]")
         pause_enter()
+        return
+    
+    screen += ["", "[bold]可选模型（按服务商分组）:[/]", ""]
+    
+    # 显示（按服务商分组）
+    screen += _model_group_lines(available_grouped)
+    
+    screen += ["", "[dim]可多选，用逗号分隔编号，如 1,3,5[/]", "[cyan]0[/] 返回", ""]
+    render_screen(console, *screen)
+    
+    picked = _ask_model_indexes(len(available_models))
+    
+    if not picked:
+        return
+    models = [available_models[i - 1]['full_name'] for i in picked]
+    if len(models) == 1:
+        add_fallback(models[0])
+    else:
+        add_fallbacks_bulk(models)
+
+
+def add_fallback(model: str) -> bool:
+    """添加备选模型（使用 CLI，错误提示友好化）"""
+    console.print(f"\n[yellow]⏳ 正在添加备选模型: {model}...[/]")
+    return _apply_models_cli(["models", "fallbacks", "add", model], f"已添加备选模型: {model}", "添加")
+
+
+def add_fallbacks_bulk(models: List[str]):
+    """依次添加多个备选模型：官方 CLI 无批量添加，逐个调用，会话内只备份一次配置"""
+    for model in models:
+        if not add_fallback(model):
+            # 某个模型失败后不再继续，避免连续报错
+            break
 
 
 def remove_fallback_menu():
@@ -1955,10 +2318,7 @@ def remove_fallback_menu():
     
     while True:
         console.clear()
-        console.print(Panel(
-            Text("➖ 移除备选模型", style="bold cyan", justify="center"),
-            box=box.DOUBLE
-        ))
+        console.print(_HEADER_REMOVE_FALLBACK)
         
         console.print()
         console.print("[bold]当前备选链:[/]")
@@ -1992,27 +2352,7 @@ def remove_fallback_menu():
 def remove_fallback(model: str):
     """移除备选模型（使用 CLI，错误提示友好化）"""
     console.print(f"\n[yellow]⏳ 正在移除备选模型: {model}...[/]")
-    try:
-        # 先手动备份配置
-        config.reload()
-        backup_path = config.backup()
-        if backup_path:
-            console.print(f"  [dim]💡 已备份配置到: {backup_path}[/]")
-        
-        stdout, stderr, code = run_cli(["models", "fallbacks", "remove", model])
-        
-        if code == 0:
-            _invalidate_model_status_cache()
-            console.print(f"\n[green]✅ 已移除备选模型: {model}[/]")
-            console.print("\n[dim]💡 此更改热生效，无需重启服务[/]")
-        else:
-            console.print(f"\n[bold red]❌ 移除失败[/]")
-            if stderr:
-                console.print(f"  [dim]详情: {stderr}[/]")
-    except Exception as e:
-        console.print(f"\n[bold red]❌ 移除失败: {e}[/]")
-    
-        pause_enter()
+    _apply_models_cli(["models", "fallbacks", "remove", model], f"已移除备选模型: {model}", "移除")
 
 
 def clear_fallbacks_menu():
@@ -2021,50 +2361,27 @@ def clear_fallbacks_menu():
         return
     
     console.print("\n[yellow]⏳ 正在清空备选链...[/]")
-    try:
-        # 先手动备份配置
-        config.reload()
-        backup_path = config.backup()
-        if backup_path:
-            console.print(f"  [dim]💡 已备份配置到: {backup_path}[/]")
-        
-        stdout, stderr, code = run_cli(["models", "fallbacks", "clear"])
-        
-        if code == 0:
-            _invalidate_model_status_cache()
-            console.print("\n[green]✅ 已清空备选链[/]")
-            console.print("\n[dim]💡 此更改热生效，无需重启服务[/]")
-        else:
-            console.print(f"\n[bold red]❌ 清空失败[/]")
-            if stderr:
-                console.print(f"  [dim]详情: {stderr}[/]")
-    except Exception as e:
-        console.print(f"\n[bold red]❌ 清空失败: {e}[/]")
-    
-        pause_enter()
+    _apply_models_cli(["models", "fallbacks", "clear"], "已清空备选链", "清空")
 
 
 def subagent_settings_menu():
     """Agent 派发管理菜单（按固定 Agent 配置，支持继承全局）"""
     selected_agent_id = ""
+    frame = MenuFrame(console)
     while True:
-        console.clear()
-        console.print(Panel(
-            Text("👥 Agent 派发管理", style="bold cyan", justify="center"),
-            box=box.DOUBLE
-        ))
-        
-        # 小贴士
-        console.print()
-        console.print("  [dim]💡 可选择任意固定 Agent，配置其派发开关与并发策略[/]")
-        console.print("  [dim]💡 被选中的固定 Agent 可继续向下派发（多层链路）[/]")
-        console.print("  [dim]💡 白名单按 Agent ID 生效：更适合固定 Agent；临时 spawn 需可匹配 ID 才能精确限制[/]")
-        console.print()
+        screen = [
+            _HEADER_SUBAGENTS,
+            # 小贴士
+            "",
+            _TIPS_SUBAGENTS,
+            "",
+        ]
         
         try:
-            config.reload()
+            config.reload_if_changed()
             agents = _dispatch_manageable_agents()
             if not agents:
+                render_screen(console, *screen, clear=True)
                 console.print("\n[yellow]⚠️ 暂无固定 Agent，请先在「主 Agent 管理」中创建[/]")
                 pause_enter()
                 return
@@ -2073,6 +2390,7 @@ def subagent_settings_menu():
                 selected_agent_id = "main" if "main" in ids else ids[0]
             status = config.get_subagent_status_for(selected_agent_id)
         except Exception as e:
+            render_screen(console, *screen, clear=True)
             console.print(f"\n[bold red]❌ 获取子 Agent 状态失败: {e}[/]")
             pause_enter()
             return
@@ -2080,101 +2398,104 @@ def subagent_settings_menu():
         enabled_str = "[green]✅ 已启用[/]" if status["enabled"] else "[red]❌ 已禁用[/]"
         allow_str = ", ".join(status["allowAgents"]) if status["allowAgents"] else "[dim]无 (禁用状态)[/]"
         
-        console.print()
-        console.print(f"  [bold]🧠 当前配置目标 Agent:[/] [cyan]{status.get('agentId', selected_agent_id)}[/]")
-        console.print(f"  [bold]🚦 是否允许派发 Agent（固定 + 临时）:[/] {enabled_str}")
         source = "Agent覆盖" if status.get("maxConcurrentFrom") == "agent" else "继承全局"
-        console.print(f"  [bold]⚡ 最大派发并发数:[/] {status['maxConcurrent']} [dim]({source})[/]")
-        console.print(f"  [bold]📋 固定 Agent 白名单:[/] {allow_str}")
-        
-        console.print()
-        console.print("[bold]操作:[/]")
-        console.print("  [cyan]1[/] 切换目标 Agent")
-        console.print("  [cyan]2[/] 切换派发开关")
-        console.print("  [cyan]3[/] 设置最大派发并发数")
-        console.print("  [cyan]4[/] 恢复全局默认并发设置")
-        console.print("  [cyan]5[/] 设置固定 Agent 白名单")
-        console.print("  [cyan]0[/] 返回")
-        console.print()
+        screen += [
+            "",
+            f"  [bold]🧠 当前配置目标 Agent:[/] [cyan]{status.get('agentId', selected_agent_id)}[/]",
+            f"  [bold]🚦 是否允许派发 Agent（固定 + 临时）:[/] {enabled_str}",
+            f"  [bold]⚡ 最大派发并发数:[/] {status['maxConcurrent']} [dim]({source})[/]",
+            f"  [bold]📋 固定 Agent 白名单:[/] {allow_str}",
+            "",
+            "[bold]操作:[/]",
+            "  [cyan]1[/] 切换目标 Agent",
+            "  [cyan]2[/] 切换派发开关",
+            "  [cyan]3[/] 设置最大派发并发数",
+            "  [cyan]4[/] 恢复全局默认并发设置",
+            "  [cyan]5[/] 设置固定 Agent 白名单",
+            "  [cyan]0[/] 返回",
+            "",
+        ]
+        frame.draw(*screen)
         
         choice = Prompt.ask("[bold green]>[/]", choices=["0", "1", "2", "3", "4", "5"], default="0")
         
         if choice == "0":
             break
-        elif choice == "1":
-            resolved = _select_agent_id(ids, title="请选择目标 Agent", default_id=selected_agent_id)
-            if not resolved:
-                console.print("\n[yellow]⚠️ 已取消选择[/]")
-                pause_enter()
-            else:
-                selected_agent_id = resolved
-        elif choice == "2":
-            try:
-                if status["enabled"]:
-                    ok = config.update_subagent_for(selected_agent_id, allow_agents=[])
-                    if ok:
-                        console.print("\n[green]✅ 已关闭 Agent 派发[/]")
+        with frame.away():
+            if choice == "1":
+                resolved = _select_agent_id(ids, title="请选择目标 Agent", default_id=selected_agent_id)
+                if not resolved:
+                    console.print("\n[yellow]⚠️ 已取消选择[/]")
+                    pause_enter()
+                else:
+                    selected_agent_id = resolved
+            elif choice == "2":
+                try:
+                    if status["enabled"]:
+                        ok = config.update_subagent_for(selected_agent_id, allow_agents=[])
+                        if ok:
+                            console.print("\n[green]✅ 已关闭 Agent 派发[/]")
+                        else:
+                            console.print("\n[bold red]❌ 禁用失败：配置写入失败[/]")
                     else:
-                        console.print("\n[bold red]❌ 禁用失败：配置写入失败[/]")
+                        ok = config.update_subagent_for(selected_agent_id, allow_agents=["*"])
+                        if ok:
+                            console.print("\n[green]✅ 已开启 Agent 派发（允许所有）[/]")
+                        else:
+                            console.print("\n[bold red]❌ 启用失败：配置写入失败[/]")
+                    if ok:
+                        console.print("\n[yellow]⚠️ 需要重启服务后生效[/]")
+                except Exception as e:
+                    console.print(f"\n[bold red]❌ 操作失败: {e}[/]")
+                    pause_enter()
+            elif choice == "3":
+                num = Prompt.ask("[bold]请输入新的最大派发并发数 [1-10][/]", default=str(status["maxConcurrent"]))
+                if num.isdigit() and 1 <= int(num) <= 10:
+                    try:
+                        ok = config.update_subagent_for(selected_agent_id, max_concurrent=int(num))
+                        if ok:
+                            console.print(f"\n[green]✅ 已设置为 {num}[/]")
+                            console.print("\n[yellow]⚠️ 需要重启服务后生效[/]")
+                        else:
+                            console.print("\n[bold red]❌ 设置失败：配置写入失败[/]")
+                    except Exception as e:
+                        console.print(f"\n[bold red]❌ 设置失败: {e}[/]")
                 else:
-                    ok = config.update_subagent_for(selected_agent_id, allow_agents=["*"])
+                    console.print("\n[bold red]❌ 无效输入[/]")
+                    pause_enter()
+            elif choice == "4":
+                try:
+                    ok = config.update_subagent_for(selected_agent_id, inherit_max_concurrent=True)
                     if ok:
-                        console.print("\n[green]✅ 已开启 Agent 派发（允许所有）[/]")
+                        console.print("\n[green]✅ 最大派发并发数已恢复继承全局[/]")
+                        console.print("\n[yellow]⚠️ 需要重启服务后生效[/]")
                     else:
-                        console.print("\n[bold red]❌ 启用失败：配置写入失败[/]")
-                if ok:
-                    console.print("\n[yellow]⚠️ 需要重启服务后生效[/]")
-            except Exception as e:
-                console.print(f"\n[bold red]❌ 操作失败: {e}[/]")
-                pause_enter()
-        elif choice == "3":
-            num = Prompt.ask("[bold]请输入新的最大派发并发数 [1-10][/]", default=str(status["maxConcurrent"]))
-            if num.isdigit() and 1 <= int(num) <= 10:
+                        console.print("\n[bold red]❌ 操作失败：配置写入失败[/]")
+                except Exception as e:
+                    console.print(f"\n[bold red]❌ 设置失败: {e}[/]")
+                    pause_enter()
+            elif choice == "5":
+                console.print("\n[dim]- 输入 '*' 允许所有固定 Agent[/]")
+                console.print("[dim]- 输入具体固定 Agent ID，用逗号分隔 (如: main1,main2)[/]")
+                console.print("[dim]- 输入空白清空白名单（将关闭派发）[/]")
+                raw = Prompt.ask("\n[bold]请输入固定 Agent 白名单[/]", default="")
+                raw = raw.strip()
+                if raw == "": 
+                    allow_list = []
+                elif raw == "*": 
+                    allow_list = ["*"]
+                else: 
+                    allow_list = [x.strip() for x in raw.split(",") if x.strip()]
                 try:
-                    ok = config.update_subagent_for(selected_agent_id, max_concurrent=int(num))
+                    ok = config.update_subagent_for(selected_agent_id, allow_agents=allow_list)
                     if ok:
-                        console.print(f"\n[green]✅ 已设置为 {num}[/]")
+                        console.print(f"\n[green]✅ 白名单已更新为: {allow_list}[/]")
                         console.print("\n[yellow]⚠️ 需要重启服务后生效[/]")
                     else:
-                        console.print("\n[bold red]❌ 设置失败：配置写入失败[/]")
+                        console.print("\n[bold red]❌ 白名单更新失败：配置写入失败[/]")
                 except Exception as e:
                     console.print(f"\n[bold red]❌ 设置失败: {e}[/]")
-            else:
-                console.print("\n[bold red]❌ 无效输入[/]")
-                pause_enter()
-        elif choice == "4":
-            try:
-                ok = config.update_subagent_for(selected_agent_id, inherit_max_concurrent=True)
-                if ok:
-                    console.print("\n[green]✅ 最大派发并发数已恢复继承全局[/]")
-                    console.print("\n[yellow]⚠️ 需要重启服务后生效[/]")
-                else:
-                    console.print("\n[bold red]❌ 操作失败：配置写入失败[/]")
-            except Exception as e:
-                console.print(f"\n[bold red]❌ 设置失败: {e}[/]")
-                pause_enter()
-        elif choice == "5":
-            console.print("\n[dim]- 输入 '*' 允许所有固定 Agent[/]")
-            console.print("[dim]- 输入具体固定 Agent ID，用逗号分隔 (如: main1,main2)[/]")
-            console.print("[dim]- 输入空白清空白名单（将关闭派发）[/]")
-            raw = Prompt.ask("\n[bold]请输入固定 Agent 白名单[/]", default="")
-            raw = raw.strip()
-            if raw == "": 
-                allow_list = []
-            elif raw == "*": 
-                allow_list = ["*"]
-            else: 
-                allow_list = [x.strip() for x in raw.split(",") if x.strip()]
-            try:
-                ok = config.update_subagent_for(selected_agent_id, allow_agents=allow_list)
-                if ok:
-                    console.print(f"\n[green]✅ 白名单已更新为: {allow_list}[/]")
-                    console.print("\n[yellow]⚠️ 需要重启服务后生效[/]")
-                else:
-                    console.print("\n[bold red]❌ 白名单更新失败：配置写入失败[/]")
-            except Exception as e:
-                console.print(f"\n[bold red]❌ 设置失败: {e}[/]")
-                pause_enter()
+                    pause_enter()
 
 
 if __name__ == "__main__":
@@ -4,6 +4,7 @@
 from core.utils import safe_input, pause_enter
 import os
 import glob
+import shutil
 import subprocess
 import signal
 from typing import List
@@ -127,7 +128,6 @@ def restart_gateway():
         elif choice == "1":
             # 发送 SIGHUP 给 openclaw-gateway 进程
             try:
-                import signal
                 # 查找 openclaw-gateway 进程
                 result = subprocess.run(["pgrep", "-f", "openclaw-gateway"], capture_output=True, text=True)
                 if result.returncode == 0:
@@ -244,7 +244,6 @@ def rollback_config():
                 pre_backup = config.backup()
                 if pre_backup:
                     console.print(f"[dim]💡 已先备份当前配置: {pre_backup}[/]")
-                import shutil
                 shutil.copy(backup_file, DEFAULT_CONFIG_PATH)
                 console.print("\n[green]✅ 已恢复，需要重启服务[/]")
                 pause_enter()
@@ -2,12 +2,22 @@
 工具配置模块 - 搜索服务（官方+第三方）、向量化配置
 增强版：按 OpenClaw 官方 schema 展示支持的搜索 provider，并提供可视化写入。
 """
-from core.utils import safe_input, pause_enter
+from core.utils import (
+    MenuFrame,
+    buffered_stdout,
+    pause_enter,
+    render_screen,
+    safe_input,
+    static_text,
+    title_panel,
+)
+import functools
 import os
 import getpass
+import mmap
 import re
-from typing import Dict, List
-from rich.console import Console
+from typing import Dict, List, Optional
+from rich.console import Console, Group
 from rich.table import Table
 from rich.panel import Panel
 from rich.text import Text
@@ -42,7 +52,7 @@ from core.search_adapters import (
     search_with_unified_failover,
 )
 
-console = Console()
+console = Console(file=buffered_stdout())
 
 
 def _run_menu_action(action, label: str):
@@ -59,22 +69,67 @@ def _run_menu_action(action, label: str):
         pause_enter()
 
 
+_ADAPTER_IDS = tuple(ADAPTER_SPECS)
+
+
+def _get_as(d: Dict, key: str, typ):
+    """取 d[key]，类型不符（或缺失）时返回 typ() 空值；只查一次字典"""
+    val = d.get(key)
+    return val if isinstance(val, typ) else typ()
+
+
+_SEARCH_ADAPTERS_CACHE = {"sig": None, "cfg": None}
+
+
+def _search_adapters_signature():
+    try:
+        st = os.stat(DEFAULT_SEARCH_ADAPTERS_PATH)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _cached_load_search_adapters() -> Dict:
+    """按文件 (mtime, size) 缓存扩展搜索配置，菜单重绘时免去重复 JSON 解析（调用方只读）"""
+    sig = _search_adapters_signature()
+    if sig is not None and sig == _SEARCH_ADAPTERS_CACHE["sig"]:
+        return _SEARCH_ADAPTERS_CACHE["cfg"]
+    cfg = load_search_adapters()
+    # 文件缺失/损坏时 load 会重写默认配置，以写入后的签名为准
+    _SEARCH_ADAPTERS_CACHE["sig"] = _search_adapters_signature()
+    _SEARCH_ADAPTERS_CACHE["cfg"] = cfg
+    return cfg
+
+
+def _invalidate_search_adapters_cache():
+    _SEARCH_ADAPTERS_CACHE["sig"] = None
+    _SEARCH_ADAPTERS_CACHE["cfg"] = None
+
+
+_ADAPTER_PROVIDER_ALIAS = {
+    "1": "zhipu",
+    "2": "serper",
+    "3": "tavily",
+    "zhipu": "zhipu",
+    "serper": "serper",
+    "tavily": "tavily",
+}
+
+
 def _resolve_adapter_provider_input(raw: str) -> str:
     v = (raw or "").strip().lower()
-    alias = {
-        "1": "zhipu",
-        "2": "serper",
-        "3": "tavily",
-        "zhipu": "zhipu",
-        "serper": "serper",
-        "tavily": "tavily",
-    }
-    return alias.get(v, "")
+    return _ADAPTER_PROVIDER_ALIAS.get(v, "")
 
 
 
 # 默认官方搜索服务列表（回退值）
 DEFAULT_OFFICIAL_SEARCH_PROVIDERS = ["brave", "perplexity", "grok", "gemini", "kimi"]
+# 运行时 schema 候选文件（按优先级）
+_OFFICIAL_SCHEMA_PATHS = (
+    "/app/src/config/schema.help.ts",
+    "/app/packages/clawdbot/node_modules/openclaw/dist/redact-snapshot-DhuwcBRX.js",
+    "/app/packages/clawdbot/node_modules/openclaw/dist/redact-snapshot-WZaTTE0O.js",
+)
 
 OFFICIAL_SEARCH_SPECS = {
     "brave": {
@@ -104,6 +159,23 @@ OFFICIAL_SEARCH_SPECS = {
     },
 }
 
+# provider -> (api_key_path, env_keys)，逐 provider 判断是否已配置 key 时一次查表
+_PROVIDER_INDEX = {
+    pid: (spec["api_key_path"], tuple(spec["env_keys"]))
+    for pid, spec in OFFICIAL_SEARCH_SPECS.items()
+}
+
+# 支持自定义 Base URL 的官方 provider
+_BASE_URL_PROVIDERS = frozenset({"perplexity", "kimi"})
+
+_SEARCH_PROVIDER_MARKER = "search provider"
+# 原文多为 "Search provider"，字节层的预筛需忽略大小写
+_SEARCH_PROVIDER_MARKER_BYTES_RE = re.compile(_SEARCH_PROVIDER_MARKER.encode(), re.I)
+_PROVIDER_RE = re.compile(r'"([a-z0-9_-]+)"')
+# schema 中 provider 枚举紧跟在说明文字附近，只解析标记前后这一段
+_SCHEMA_WINDOW_BEFORE = 256
+_SCHEMA_WINDOW_AFTER = 512
+
 
 def _parse_supported_search_providers_from_schema(text: str) -> List[str]:
     """
@@ -114,81 +186,110 @@ def _parse_supported_search_providers_from_schema(text: str) -> List[str]:
     if not text:
         return []
     low = text.lower()
-    if "search provider" not in low:
+    if _SEARCH_PROVIDER_MARKER not in low:
         return []
     # 提取双引号中的值（如 "brave"）
-    cands = re.findall(r'"([a-z0-9_-]+)"', low)
-    providers = [c for c in cands if c in OFFICIAL_SEARCH_SPECS]
+    cands = _PROVIDER_RE.findall(low)
     # 去重并保持顺序
-    seen = set()
-    out = []
-    for p in providers:
-        if p not in seen:
-            seen.add(p)
-            out.append(p)
-    return out
+    return [c for c in dict.fromkeys(cands) if c in OFFICIAL_SEARCH_SPECS]
 
 
 def get_official_search_providers() -> List[str]:
     """获取 OpenClaw 官方支持的 web_search provider（优先运行时 schema）。"""
+    return list(_load_official_search_providers(_official_schema_signature()))
+
+
+def _official_schema_signature() -> tuple:
+    """各 schema 文件的 (mtime, size)；OpenClaw 升级替换文件后签名变化，缓存随之失效"""
+    sig = []
+    for path in _OFFICIAL_SCHEMA_PATHS:
+        try:
+            st = os.stat(path)
+        except OSError:
+            sig.append(None)
+            continue
+        sig.append((st.st_mtime_ns, st.st_size))
+    return tuple(sig)
+
+
+@functools.lru_cache(maxsize=1)
+def _load_official_search_providers(schema_sig: tuple) -> tuple:
+    # schema_sig 只作缓存键：schema 文件未变化时不再重复读取解析
     base = list(DEFAULT_OFFICIAL_SEARCH_PROVIDERS)
 
     # 1) 从运行时 schema.help.ts 解析（与你容器中的 OpenClaw 版本一致）
-    schema_paths = [
-        "/app/src/config/schema.help.ts",
-        "/app/packages/clawdbot/node_modules/openclaw/dist/redact-snapshot-DhuwcBRX.js",
-        "/app/packages/clawdbot/node_modules/openclaw/dist/redact-snapshot-WZaTTE0O.js",
-    ]
-    for path in schema_paths:
+    for path in _OFFICIAL_SCHEMA_PATHS:
         try:
             if os.path.exists(path):
-                with open(path, "r", encoding="utf-8", errors="ignore") as f:
-                    text = f.read()
+                # 打包 JS 可达数 MB：mmap 后直接在字节上找标记，只解码标记附近的窗口
+                with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    m = _SEARCH_PROVIDER_MARKER_BYTES_RE.search(mm)
+                    if not m:
+                        continue
+                    start = m.start()
+                    window = mm[max(0, start - _SCHEMA_WINDOW_BEFORE):start + _SCHEMA_WINDOW_AFTER]
+                text = window.decode("utf-8", errors="ignore")
                 parsed = _parse_supported_search_providers_from_schema(text)
                 if parsed:
                     # 并集策略：保留最新基线能力，同时吸收运行时实际发现值
-                    out = []
-                    seen = set()
-                    for p in base + parsed:
-                        if p in OFFICIAL_SEARCH_SPECS and p not in seen:
-                            seen.add(p)
-                            out.append(p)
-                    return out
+                    return tuple(p for p in dict.fromkeys(base + parsed) if p in OFFICIAL_SEARCH_SPECS)
         except Exception:
             pass
 
     # 2) 回退：默认官方列表
-    return base
+    return tuple(base)
+
+
+def _ensure_search_config_root() -> Dict:
+    """确保 tools.web.search 存在并返回该节点（每层 setdefault 一次查找）"""
+    return config.data.setdefault("tools", {}).setdefault("web", {}).setdefault("search", {})
+
+
+_MISSING = object()
 
 
-def _ensure_search_config_root():
-    if "tools" not in config.data:
-        config.data["tools"] = {}
-    if "web" not in config.data["tools"]:
-        config.data["tools"]["web"] = {}
-    if "search" not in config.data["tools"]["web"]:
-        config.data["tools"]["web"]["search"] = {}
+@functools.lru_cache(maxsize=256)
+def _split_path(dotted_path: str) -> tuple:
+    """拆分点分路径（去掉空段）；调用方的路径多为固定字面量，按字符串缓存拆分结果"""
+    return tuple(k for k in dotted_path.split(".") if k)
 
 
 def _set_nested(d: Dict, dotted_path: str, value):
-    keys = [k for k in (dotted_path or "").split(".") if k]
+    keys = _split_path(dotted_path or "")
     if not keys:
         return
     cur = d
     for key in keys[:-1]:
-        if key not in cur or not isinstance(cur.get(key), dict):
-            cur[key] = {}
-        cur = cur[key]
+        sub = cur.get(key)
+        if not isinstance(sub, dict):
+            sub = {}
+            cur[key] = sub
+        cur = sub
     cur[keys[-1]] = value
 
 
+def _unset_nested(d: Dict, dotted_path: str) -> bool:
+    """删除点分路径对应的键，返回是否实际删除"""
+    keys = _split_path(dotted_path or "")
+    if not keys:
+        return False
+    cur = d
+    for key in keys[:-1]:
+        cur = cur.get(key)
+        if not isinstance(cur, dict):
+            return False
+    return cur.pop(keys[-1], _MISSING) is not _MISSING
+
+
 def _get_nested(d: Dict, dotted_path: str, default=None):
-    keys = [k for k in (dotted_path or "").split(".") if k]
+    # 每层只做一次 dict.get（以哨兵区分“缺失”与值为 None），不再先 in 再取值
     cur = d
-    for key in keys:
-        if not isinstance(cur, dict) or key not in cur:
+    for key in _split_path(dotted_path or ""):
+        if not isinstance(cur, dict):
+            return default
+        cur = cur.get(key, _MISSING)
+        if cur is _MISSING:
             return default
-        cur = cur[key]
     return cur
 
 
@@ -196,12 +297,11 @@ def set_search_provider(provider: str) -> bool:
     provider = (provider or "").strip().lower()
     if provider not in OFFICIAL_SEARCH_SPECS:
         return False
-    config.reload()
+    config.reload_if_changed()
     backup_path = config.backup()
     if backup_path:
         console.print(f"\n  [dim]💡 已备份配置到: {backup_path}[/]")
-    _ensure_search_config_root()
-    config.data["tools"]["web"]["search"]["provider"] = provider
+    _ensure_search_config_root()["provider"] = provider
     return config.save()
 
 
@@ -213,7 +313,7 @@ def set_official_search_api_key(provider: str, api_key: str) -> bool:
     path = spec["api_key_path"]
     if not api_key:
         return False
-    config.reload()
+    config.reload_if_changed()
     backup_path = config.backup()
     if backup_path:
         console.print(f"\n  [dim]💡 已备份配置到: {backup_path}[/]")
@@ -222,257 +322,332 @@ def set_official_search_api_key(provider: str, api_key: str) -> bool:
         config.reload()
         return True
     # fallback：本地写入
-    _ensure_search_config_root()
+    search_cfg = _ensure_search_config_root()
     rel_path = path.replace("tools.web.search.", "")
-    search_cfg = config.data["tools"]["web"]["search"]
     _set_nested(search_cfg, rel_path, api_key)
     return config.save()
 
 
-def _provider_has_configured_key(provider: str, env_keys: Dict[str, str]) -> bool:
-    provider = (provider or "").strip().lower()
-    spec = OFFICIAL_SEARCH_SPECS.get(provider, {})
-    key_path = spec.get("api_key_path", "")
-    if key_path:
-        config_key = _get_nested(config.data, key_path, "")
-        if isinstance(config_key, str) and config_key.strip():
-            return True
-    for env_key in spec.get("env_keys", []):
-        if env_keys.get(env_key, "").strip():
+def _provider_has_configured_key(provider: str, env_keys: Dict[str, str], config_data: Optional[Dict] = None) -> bool:
+    entry = _PROVIDER_INDEX.get((provider or "").strip().lower())
+    if entry is None:
+        return False
+    key_path, env_list = entry
+    config_key = _get_nested(config.data if config_data is None else config_data, key_path, "")
+    if isinstance(config_key, str) and config_key.strip():
+        return True
+    for env_key in env_list:
+        if (env_keys.get(env_key) or "").strip():
             return True
     return False
 
 
-def list_configured_official_search_providers(providers: List[str]) -> List[str]:
-    """返回已配置 API Key（config 或 .env）的官方搜索 provider。"""
-    config.reload()
-    env_keys = read_env_keys()
+def list_configured_official_search_providers(
+    providers: List[str],
+    env_keys: Optional[Dict[str, str]] = None,
+    config_data: Optional[Dict] = None,
+) -> List[str]:
+    """返回已配置 API Key（config 或 .env）的官方搜索 provider。
+
+    调用方已在本帧 reload 并读取 .env 时，可传入 env_keys / config_data 以免重复 I/O。
+    """
+    if config_data is None:
+        config.reload()
+        config_data = config.data
+    if env_keys is None:
+        env_keys = read_env_keys()
     out = []
     for p in providers:
-        if _provider_has_configured_key(p, env_keys):
+        if _provider_has_configured_key(p, env_keys, config_data):
             out.append(p)
     return out
 
 
+# 各菜单的固定标题与操作区：导入时构建一次，重绘时只渲染变化的状态行
+_TOOLS_MENU = static_text(
+    "",
+    "[bold cyan]========== 🧭 工具配置 ==========[/]",
+    "",
+    "[bold]功能:[/]",
+    "  [cyan]1[/] 搜索服务管理 (官方+第三方)",
+    "  [cyan]2[/] 向量化/记忆检索配置 (Embeddings)",
+    "  [cyan]0[/] 返回",
+    "",
+)
+_HEADER_SEARCH_SERVICES = title_panel("🔍 搜索服务管理")
+_SEARCH_SERVICES_ACTIONS = static_text(
+    "",
+    "[bold]操作:[/]",
+    "  [cyan]1[/] 添加与维护搜索服务",
+    "  [cyan]2[/] 激活默认搜索服务",
+    "  [cyan]3[/] 搜索服务主备切换设置",
+    "  [cyan]0[/] 返回",
+    "",
+)
+_SEARCH_MAINTENANCE_MENU = Group(
+    title_panel("🧩 添加与维护搜索服务"),
+    static_text(
+        "",
+        "[bold]操作:[/]",
+        "  [cyan]1[/] 官方支持服务搜索配置（增/清空）",
+        "  [cyan]2[/] 扩展搜索服务配置（增/清空）",
+        "  [cyan]0[/] 返回",
+        "",
+    ),
+)
+_HEADER_FAILOVER = title_panel("🔁 搜索服务主备切换设置")
+_FAILOVER_ACTIONS = static_text(
+    "",
+    "[dim]可选源:[/]",
+    "  1 official:brave",
+    "  2 official:perplexity",
+    "  3 official:grok",
+    "  4 official:gemini",
+    "  5 official:kimi",
+    "  6 adapter:zhipu",
+    "  7 adapter:serper",
+    "  8 adapter:tavily",
+    "",
+    "[bold]操作:[/]",
+    "  [cyan]1[/] 设置主搜索服务商",
+    "  [cyan]2[/] 设置候选搜索服务商（逗号分隔）",
+    "  [cyan]3[/] 演练主备切换",
+    "  [cyan]0[/] 返回",
+    "",
+)
+_HEADER_OFFICIAL_SEARCH = title_panel("🔍 官方搜索服务配置")
+_ADAPTER_PROVIDER_ACTIONS = static_text(
+    "",
+    "[bold]操作:[/]",
+    "  [cyan]1[/] 切换启用状态",
+    "  [cyan]2[/] 设置 API Key",
+    "  [cyan]3[/] 设置 Base URL",
+    "  [cyan]4[/] 设置 TopK",
+    "  [cyan]5[/] 设置冷却秒数 (限流后跳过)",
+    "  [cyan]6[/] 连接测试",
+    "  [cyan]7[/] 清空此扩展源配置",
+    "  [cyan]0[/] 返回",
+    "",
+)
+_HEADER_SELECT_DEFAULT_SEARCH = title_panel("选择默认搜索服务")
+_HEADER_ACTIVATE_SEARCH = title_panel("激活已配置 Key 的搜索服务")
+_HEADER_EMBEDDINGS = title_panel("🔍 向量化/记忆检索配置")
+_EMBEDDINGS_OPTIONS = static_text(
+    "",
+    "[bold]选项:[/]",
+    "  [cyan]1[/] Auto (按已配置 Provider 凭据自动选择)",
+    "  [cyan]2[/] OpenAI",
+    "  [cyan]3[/] Gemini",
+    "  [cyan]4[/] Voyage",
+    "  [cyan]5[/] Mistral",
+    "  [cyan]6[/] 管理向量 Provider 凭据",
+    "  [cyan]V[/] 查看索引验证命令",
+    "  [cyan]0[/] 返回",
+    "",
+)
+_HEADER_THIRDPARTY_SEARCH = title_panel("🔍 扩展搜索源 (智谱/Serper/Tavily)")
+_THIRDPARTY_SEARCH_ACTIONS = static_text(
+    "",
+    "[bold]操作:[/]",
+    "  [cyan]1[/] 配置 zhipu",
+    "  [cyan]2[/] 配置 serper",
+    "  [cyan]3[/] 配置 tavily",
+    "  [cyan]4[/] 设置激活扩展源",
+    "  [cyan]5[/] 测试激活扩展源连接",
+    "  [cyan]0[/] 返回",
+    "",
+)
+
+
 def menu_tools():
     """工具配置主菜单（增强版）"""
+    frame = MenuFrame(console)
     while True:
-        console.clear()
-        console.print()
-        console.print("[bold cyan]========== 🧭 工具配置 ==========[/]")
-        console.print()
-        
-        console.print("[bold]功能:[/]")
-        console.print("  [cyan]1[/] 搜索服务管理 (官方+第三方)")
-        console.print("  [cyan]2[/] 向量化/记忆检索配置 (Embeddings)")
-        console.print("  [cyan]0[/] 返回")
-        console.print()
+        frame.draw(_TOOLS_MENU)
         
         choice = Prompt.ask("[bold green]>[/]", choices=["0", "1", "2"], default="0").strip().lower()
-        while choice not in ["0", "1", "2"]:
-            choice = Prompt.ask("[bold green]>[/]", choices=["0", "1", "2"], default="0").strip().lower()
         
         if choice == "0":
             break
-        elif choice == "1":
-            _run_menu_action(menu_search_services, "搜索服务管理")
-        elif choice == "2":
-            _run_menu_action(menu_embeddings, "向量化/记忆检索配置")
+        with frame.away(keep_menu=False):
+            if choice == "1":
+                _run_menu_action(menu_search_services, "搜索服务管理")
+            elif choice == "2":
+                _run_menu_action(menu_embeddings, "向量化/记忆检索配置")
 
 
 def menu_search_services():
     """搜索服务管理主菜单（统一入口）"""
+    frame = MenuFrame(console)
     while True:
-        console.clear()
-        console.print(Panel(
-            Text("🔍 搜索服务管理", style="bold cyan", justify="center"),
-            box=box.DOUBLE
-        ))
-        
         config.reload()
-        search_cfg = config.data.get("tools", {}).get("web", {}).get("search", {})
-        default_provider = str(search_cfg.get("provider", "") or "")
-        official_configured = list_configured_official_search_providers(get_official_search_providers())
-        adapter_cfg = load_search_adapters()
+        default_provider = str(_get_nested(config.data, "tools.web.search.provider", "") or "")
+        official_configured = list_configured_official_search_providers(
+            get_official_search_providers(),
+            env_keys=read_env_keys(),
+            config_data=config.data,
+        )
+        adapter_cfg = _cached_load_search_adapters()
         primary_source = str(adapter_cfg.get("primarySource", "") or "")
-        fallback_sources = adapter_cfg.get("fallbackSources", []) if isinstance(adapter_cfg.get("fallbackSources"), list) else []
+        fallback_sources = _get_as(adapter_cfg, "fallbackSources", list)
         
-        console.print()
-        console.print(f"[bold]当前默认搜索服务:[/] {default_provider or '(未设置)'}")
-        console.print(f"[bold]已配置官方服务:[/] {', '.join(official_configured) if official_configured else '(无)'}")
-        console.print(f"[bold]主搜索服务商:[/] {primary_source or '(未设置)'}")
-        console.print(f"[bold]候选搜索服务商:[/] {' -> '.join(fallback_sources) if fallback_sources else '(未设置)'}")
-        
-        console.print()
-        console.print("[bold]操作:[/]")
-        console.print("  [cyan]1[/] 添加与维护搜索服务")
-        console.print("  [cyan]2[/] 激活默认搜索服务")
-        console.print("  [cyan]3[/] 搜索服务主备切换设置")
-        console.print("  [cyan]0[/] 返回")
-        console.print()
+        frame.draw(
+            _HEADER_SEARCH_SERVICES,
+            "",
+            f"[bold]当前默认搜索服务:[/] {default_provider or '(未设置)'}",
+            f"[bold]已配置官方服务:[/] {', '.join(official_configured) if official_configured else '(无)'}",
+            f"[bold]主搜索服务商:[/] {primary_source or '(未设置)'}",
+            f"[bold]候选搜索服务商:[/] {' -> '.join(fallback_sources) if fallback_sources else '(未设置)'}",
+            _SEARCH_SERVICES_ACTIONS,
+        )
         
         choice = Prompt.ask("[bold green]>[/]", choices=["0", "1", "2", "3"], default="0").strip().lower()
-        while choice not in ["0", "1", "2", "3"]:
-            choice = Prompt.ask("[bold green]>[/]", choices=["0", "1", "2", "3"], default="0").strip().lower()
         
         if choice == "0":
             break
-        elif choice == "1":
-            _run_menu_action(menu_search_service_maintenance, "添加与维护搜索服务")
-        elif choice == "2":
-            _run_menu_action(activate_configured_search_provider, "激活默认搜索服务")
-        elif choice == "3":
-            _run_menu_action(menu_search_failover_settings, "搜索服务主备切换设置")
+        with frame.away(keep_menu=False):
+            if choice == "1":
+                _run_menu_action(menu_search_service_maintenance, "添加与维护搜索服务")
+            elif choice == "2":
+                _run_menu_action(activate_configured_search_provider, "激活默认搜索服务")
+            elif choice == "3":
+                _run_menu_action(menu_search_failover_settings, "搜索服务主备切换设置")
 
 
 def menu_search_service_maintenance():
     """添加与维护搜索服务"""
+    frame = MenuFrame(console)
     while True:
-        console.clear()
-        console.print(Panel(
-            Text("🧩 添加与维护搜索服务", style="bold cyan", justify="center"),
-            box=box.DOUBLE
-        ))
-        console.print()
-        console.print("[bold]操作:[/]")
-        console.print("  [cyan]1[/] 官方支持服务搜索配置（增/清空）")
-        console.print("  [cyan]2[/] 扩展搜索服务配置（增/清空）")
-        console.print("  [cyan]0[/] 返回")
-        console.print()
+        frame.draw(_SEARCH_MAINTENANCE_MENU)
         choice = Prompt.ask("[bold green]>[/]", choices=["0", "1", "2"], default="0").strip().lower()
         if choice == "0":
             return
-        if choice == "1":
-            _run_menu_action(menu_official_search, "官方搜索配置")
-        elif choice == "2":
-            _run_menu_action(menu_thirdparty_search, "扩展搜索配置")
+        with frame.away(keep_menu=False):
+            if choice == "1":
+                _run_menu_action(menu_official_search, "官方搜索配置")
+            elif choice == "2":
+                _run_menu_action(menu_thirdparty_search, "扩展搜索配置")
+
+
+_ADAPTER_SOURCES = ("adapter:zhipu", "adapter:serper", "adapter:tavily")
+# 编号与合法来源名统一映射到来源名，解析每个输入 token 只需一次查表
+_UNIFIED_SOURCE_ALIAS = {
+    "1": "official:brave",
+    "2": "official:perplexity",
+    "3": "official:grok",
+    "4": "official:gemini",
+    "5": "official:kimi",
+    "6": "adapter:zhipu",
+    "7": "adapter:serper",
+    "8": "adapter:tavily",
+}
+_UNIFIED_SOURCE_ALIAS.update({src: src for src in (*OFFICIAL_SEARCH_SOURCES, *_ADAPTER_SOURCES)})
 
 
 def _resolve_unified_source_input(raw: str) -> str:
     v = (raw or "").strip().lower()
-    source_index = {
-        "1": "official:brave",
-        "2": "official:perplexity",
-        "3": "official:grok",
-        "4": "official:gemini",
-        "5": "official:kimi",
-        "6": "adapter:zhipu",
-        "7": "adapter:serper",
-        "8": "adapter:tavily",
-    }
-    if v in source_index:
-        return source_index[v]
-    if v in OFFICIAL_SEARCH_SOURCES:
-        return v
-    if v in ["adapter:zhipu", "adapter:serper", "adapter:tavily"]:
-        return v
-    return ""
+    return _UNIFIED_SOURCE_ALIAS.get(v, "")
 
 
 def menu_search_failover_settings():
     """搜索服务主备切换设置"""
+    frame = MenuFrame(console)
     while True:
-        console.clear()
-        console.print(Panel(
-            Text("🔁 搜索服务主备切换设置", style="bold cyan", justify="center"),
-            box=box.DOUBLE
-        ))
-        cfg = load_search_adapters()
+        cfg = _cached_load_search_adapters()
         primary = str(cfg.get("primarySource", "") or "")
-        fallbacks = cfg.get("fallbackSources", []) if isinstance(cfg.get("fallbackSources"), list) else []
-        console.print()
-        console.print(f"[bold]主搜索服务商:[/] {primary or '(未设置)'}")
-        console.print(f"[bold]候选搜索服务商:[/] {' -> '.join(fallbacks) if fallbacks else '(未设置)'}")
-        console.print()
-        console.print("[dim]可选源:[/]")
-        console.print("  1 official:brave")
-        console.print("  2 official:perplexity")
-        console.print("  3 official:grok")
-        console.print("  4 official:gemini")
-        console.print("  5 official:kimi")
-        console.print("  6 adapter:zhipu")
-        console.print("  7 adapter:serper")
-        console.print("  8 adapter:tavily")
-        console.print()
-        console.print("[bold]操作:[/]")
-        console.print("  [cyan]1[/] 设置主搜索服务商")
-        console.print("  [cyan]2[/] 设置候选搜索服务商（逗号分隔）")
-        console.print("  [cyan]3[/] 演练主备切换")
-        console.print("  [cyan]0[/] 返回")
-        console.print()
+        fallbacks = _get_as(cfg, "fallbackSources", list)
+        frame.draw(
+            _HEADER_FAILOVER,
+            "",
+            f"[bold]主搜索服务商:[/] {primary or '(未设置)'}",
+            f"[bold]候选搜索服务商:[/] {' -> '.join(fallbacks) if fallbacks else '(未设置)'}",
+            _FAILOVER_ACTIONS,
+        )
         choice = Prompt.ask("[bold green]>[/]", choices=["0", "1", "2", "3"], default="0").strip().lower()
         if choice == "0":
             return
-        if choice == "1":
-            raw = Prompt.ask("[bold]请输入主搜索服务商编号或source_id（留空清除）[/]", default="").strip()
-            target = _resolve_unified_source_input(raw) if raw else ""
-            ok = set_primary_source(target)
-            console.print(f"\n[green]✅ 已设置主搜索服务商: {target or '(未设置)'}[/]" if ok else "\n[bold red]❌ 设置失败[/]")
-            pause_enter()
-        elif choice == "2":
-            raw = Prompt.ask("[bold]请输入候选服务商（逗号分隔，编号或source_id；留空清除）[/]", default="").strip()
-            items = []
-            for part in raw.split(","):
-                sid = _resolve_unified_source_input(part)
-                if sid and sid not in items:
-                    items.append(sid)
-            ok = set_fallback_sources(items)
-            console.print(f"\n[green]✅ 已设置候选搜索服务商: {' -> '.join(items) if items else '(未设置)'}[/]" if ok else "\n[bold red]❌ 设置失败[/]")
-            pause_enter()
-        elif choice == "3":
-            q = Prompt.ask("[bold]请输入演练查询词[/]", default="OpenClaw").strip() or "OpenClaw"
-            try:
-                results = search_with_unified_failover(q, count=3)
-                cfg = load_search_adapters()
-                src = str(cfg.get("activeSource", "") or "")
-                console.print(f"\n[green]✅ 演练成功，当前命中: {src}，结果数: {len(results)}[/]")
-            except Exception as e:
-                console.print(f"\n[bold red]❌ 演练失败: {e}[/]")
-            pause_enter()
+        with frame.away():
+            if choice == "1":
+                raw = Prompt.ask("[bold]请输入主搜索服务商编号或source_id（留空清除）[/]", default="").strip()
+                target = _resolve_unified_source_input(raw) if raw else ""
+                ok = set_primary_source(target)
+                _invalidate_search_adapters_cache()
+                console.print(f"\n[green]✅ 已设置主搜索服务商: {target or '(未设置)'}[/]" if ok else "\n[bold red]❌ 设置失败[/]")
+                pause_enter()
+            elif choice == "2":
+                raw = Prompt.ask("[bold]请输入候选服务商（逗号分隔，编号或source_id；留空清除）[/]", default="").strip()
+                # 逐个 token 查表解析，按首次出现顺序去重
+                items = [sid for sid in dict.fromkeys(map(_resolve_unified_source_input, raw.split(","))) if sid]
+                ok = set_fallback_sources(items)
+                _invalidate_search_adapters_cache()
+                console.print(f"\n[green]✅ 已设置候选搜索服务商: {' -> '.join(items) if items else '(未设置)'}[/]" if ok else "\n[bold red]❌ 设置失败[/]")
+                pause_enter()
+            elif choice == "3":
+                q = Prompt.ask("[bold]请输入演练查询词[/]", default="OpenClaw").strip() or "OpenClaw"
+                try:
+                    results = search_with_unified_failover(q, count=3)
+                    _invalidate_search_adapters_cache()
+                    cfg = _cached_load_search_adapters()
+                    src = str(cfg.get("activeSource", "") or "")
+                    console.print(f"\n[green]✅ 演练成功，当前命中: {src}，结果数: {len(results)}[/]")
+                except Exception as e:
+                    console.print(f"\n[bold red]❌ 演练失败: {e}[/]")
+                pause_enter()
 
 
 def menu_official_search():
     """官方搜索服务配置"""
+    # provider 列表会话内已缓存，选项随之固定，循环外构建一次
+    providers = get_official_search_providers()
+    choices = ["0"] + [str(i) for i in range(1, len(providers) + 1)]
+    provider_rows = tuple(
+        (i, provider, OFFICIAL_SEARCH_SPECS.get(provider, {}).get("label", provider))
+        for i, provider in enumerate(providers, 1)
+    )
+    frame = MenuFrame(console)
     while True:
-        console.clear()
-        console.print(Panel(
-            Text("🔍 官方搜索服务配置", style="bold cyan", justify="center"),
-            box=box.DOUBLE
-        ))
-        
-        providers = get_official_search_providers()
-        configured = set(list_configured_official_search_providers(providers))
         config.reload()
-        default_provider = str(config.data.get("tools", {}).get("web", {}).get("search", {}).get("provider", "") or "")
+        configured = set(list_configured_official_search_providers(
+            providers,
+            env_keys=read_env_keys(),
+            config_data=config.data,
+        ))
+        default_provider = str(_get_nested(config.data, "tools.web.search.provider", "") or "")
         
-        console.print()
-        console.print(f"[bold]当前默认搜索服务:[/] {default_provider or '(未设置)'}")
-        console.print("[bold]OpenClaw 官方支持搜索服务:[/]")
-        for i, provider in enumerate(providers, 1):
-            label = OFFICIAL_SEARCH_SPECS.get(provider, {}).get("label", provider)
+        rows = [
+            _HEADER_OFFICIAL_SEARCH,
+            "",
+            f"[bold]当前默认搜索服务:[/] {default_provider or '(未设置)'}",
+            "[bold]OpenClaw 官方支持搜索服务:[/]",
+        ]
+        for i, provider, label in provider_rows:
             mark = "✅" if provider in configured else "⬜"
             default_mark = "⭐" if provider == default_provider else "  "
-            console.print(f"  [cyan]{i}[/] {default_mark} {mark} {provider} [dim]({label})[/]")
-        
-        console.print("  [cyan]0[/] 返回")
-        console.print()
+            rows.append(f"  [cyan]{i}[/] {default_mark} {mark} {provider} [dim]({label})[/]")
+        rows += ["  [cyan]0[/] 返回", ""]
+        frame.draw(*rows)
         
-        choices = ["0"] + [str(i) for i in range(1, len(providers) + 1)]
         choice = Prompt.ask("[bold green]>[/]", choices=choices, default="0").strip().lower()
-        while choice not in choices:
-            choice = Prompt.ask("[bold green]>[/]", choices=choices, default="0").strip().lower()
         
         if choice == "0":
             break
-        elif choice.isdigit():
-            idx = int(choice) - 1
-            if 0 <= idx < len(providers):
-                provider = providers[idx]
-                _run_menu_action(lambda p=provider: configure_official_search(p), f"配置官方搜索服务 {provider}")
+        with frame.away(keep_menu=False):
+            if choice.isdigit():
+                idx = int(choice) - 1
+                if 0 <= idx < len(providers):
+                    provider = providers[idx]
+                    _run_menu_action(lambda p=provider: configure_official_search(p), f"配置官方搜索服务 {provider}")
 
 
 def configure_official_search(provider: str):
     """配置单个官方搜索服务"""
+    provider = (provider or "").strip().lower()
+    spec = OFFICIAL_SEARCH_SPECS.get(provider, {})
+    env_keys = spec.get("env_keys", [])
+    has_base_url = provider in _BASE_URL_PROVIDERS
+    choices = ["0", "1", "2", "3", "6"]
+    if has_base_url:
+        choices += ["4"]
     while True:
         console.clear()
         console.print(Panel(
@@ -480,34 +655,21 @@ def configure_official_search(provider: str):
             box=box.DOUBLE
         ))
         
-        provider = (provider or "").strip().lower()
-        spec = OFFICIAL_SEARCH_SPECS.get(provider, {})
-        # 获取当前配置
-        config.reload()
-        search_cfg = config.data.get("tools", {}).get("web", {}).get("search", {})
-        
         console.print()
         console.print("[bold]操作:[/]")
         console.print("  [cyan]1[/] 设为默认搜索服务")
         console.print("  [cyan]2[/] 写入 API Key 到配置")
-        env_keys = spec.get("env_keys", [])
         if env_keys:
             console.print(f"  [cyan]3[/] 使用环境变量方式配置 Key ({', '.join(env_keys)})")
         
-        if provider in ["perplexity", "kimi"]:
+        if has_base_url:
             console.print("  [cyan]4[/] 设置 Base URL")
         console.print("  [cyan]6[/] 清空此服务配置")
         
         console.print("  [cyan]0[/] 返回")
         console.print()
         
-        choices = ["0", "1", "2", "3", "6"]
-        if provider in ["perplexity", "kimi"]:
-            choices += ["4"]
-        
         choice = Prompt.ask("[bold green]>[/]", choices=choices, default="0").strip().lower()
-        while choice not in choices:
-            choice = Prompt.ask("[bold green]>[/]", choices=choices, default="0").strip().lower()
         
         if choice == "0":
             break
@@ -537,7 +699,7 @@ def configure_official_search(provider: str):
             first_key = env_keys[0] if env_keys else f"{provider.upper()}_API_KEY"
             choose_or_prompt_key(first_key, provider)
             pause_enter()
-        elif choice == "4" and provider in ["perplexity", "kimi"]:
+        elif choice == "4" and has_base_url:
             set_provider_baseurl(provider)
         elif choice == "6":
             clear_official_search_provider_config(provider)
@@ -578,15 +740,23 @@ def clear_official_search_provider_config(provider: str):
     if not Confirm.ask(f"[bold red]确认清空 {provider} 的搜索配置？[/]", default=False):
         return
 
-    config.reload()
+    config.reload_if_changed()
     backup_path = config.backup()
     if backup_path:
         console.print(f"\n  [dim]💡 已备份配置到: {backup_path}[/]")
-    ok = True
+    failed = []
     for path in unset_paths:
         _, _, code = run_cli(["config", "unset", path])
         if code != 0:
-            ok = False
+            failed.append(path)
+    # CLI 可能已写入部分路径，先重新加载再处理
+    config.reload()
+    ok = True
+    if failed:
+        # fallback：失败的路径在本地一次删除、一次落盘
+        for path in failed:
+            _unset_nested(config.data, path)
+        ok = config.save()
     if ok:
         console.print(f"\n[green]✅ 已清空 {provider} 搜索配置[/]")
     else:
@@ -613,7 +783,7 @@ def set_provider_baseurl(provider: str):
         pause_enter()
         return
 
-    config.reload()
+    config.reload_if_changed()
     current = _get_nested(config.data, config_path, "")
     
     console.print()
@@ -623,7 +793,7 @@ def set_provider_baseurl(provider: str):
     new_url = Prompt.ask("[bold]请输入 Base URL[/]", default=current).strip()
     
     # 备份
-    config.reload()
+    config.reload_if_changed()
     backup_path = config.backup()
     if backup_path:
         console.print(f"\n  [dim]💡 已备份配置到: {backup_path}[/]")
@@ -631,9 +801,9 @@ def set_provider_baseurl(provider: str):
     # 优先官方命令写入，失败回退本地写入
     _, _, code = run_cli(["config", "set", config_path, new_url, "--json"])
     if code != 0:
-        _ensure_search_config_root()
+        search_cfg = _ensure_search_config_root()
         rel_path = config_path.replace("tools.web.search.", "")
-        _set_nested(config.data["tools"]["web"]["search"], rel_path, new_url)
+        _set_nested(search_cfg, rel_path, new_url)
         config.save()
     else:
         config.reload()
@@ -663,7 +833,7 @@ def set_provider_model(provider: str):
         pause_enter()
         return
 
-    config.reload()
+    config.reload_if_changed()
     current = _get_nested(config.data, config_path, "")
     
     console.print()
@@ -673,7 +843,7 @@ def set_provider_model(provider: str):
     new_model = Prompt.ask("[bold]请输入 Model[/]", default=current).strip()
     
     # 备份
-    config.reload()
+    config.reload_if_changed()
     backup_path = config.backup()
     if backup_path:
         console.print(f"\n  [dim]💡 已备份配置到: {backup_path}[/]")
@@ -681,9 +851,9 @@ def set_provider_model(provider: str):
     # 优先官方命令写入，失败回退本地写入
     _, _, code = run_cli(["config", "set", config_path, new_model, "--json"])
     if code != 0:
-        _ensure_search_config_root()
+        search_cfg = _ensure_search_config_root()
         rel_path = config_path.replace("tools.web.search.", "")
-        _set_nested(config.data["tools"]["web"]["search"], rel_path, new_model)
+        _set_nested(search_cfg, rel_path, new_model)
         config.save()
     else:
         config.reload()
@@ -692,29 +862,22 @@ def set_provider_model(provider: str):
     pause_enter()
 
 
-def _render_adapter_status():
-    cfg = load_search_adapters()
+def _adapter_status_renderables() -> list:
+    cfg = _cached_load_search_adapters()
     active = cfg.get("active", "")
     primary = cfg.get("primary", "")
-    fallbacks = cfg.get("fallbacks", []) if isinstance(cfg.get("fallbacks"), list) else []
+    fallbacks = _get_as(cfg, "fallbacks", list)
     primary_source = cfg.get("primarySource", "") or (f"adapter:{primary}" if primary else "")
-    fallback_sources = cfg.get("fallbackSources", []) if isinstance(cfg.get("fallbackSources"), list) else []
-    providers = cfg.get("providers", {}) if isinstance(cfg.get("providers"), dict) else {}
-    console.print()
-    console.print(f"[bold]配置文件:[/] {DEFAULT_SEARCH_ADAPTERS_PATH}")
-    console.print(f"[bold]当前激活扩展源:[/] {active or '(未激活)'}")
-    console.print(f"[bold]主搜索源:[/] {primary or '(未设置)'}")
-    console.print(f"[bold]备用链:[/] {' -> '.join(fallbacks) if fallbacks else '(未设置)'}")
-    console.print(f"[bold]统一主源(官方+扩展):[/] {primary_source or '(未设置)'}")
-    console.print(f"[bold]统一备用链(官方+扩展):[/] {' -> '.join(fallback_sources) if fallback_sources else '(未设置)'}")
+    fallback_sources = _get_as(cfg, "fallbackSources", list)
+    providers = _get_as(cfg, "providers", dict)
     table = Table(box=box.SIMPLE)
     table.add_column("Provider", style="cyan")
     table.add_column("已启用", style="bold", width=6)
     table.add_column("Key", style="yellow", width=10)
     table.add_column("冷却(s)", style="magenta", width=8)
     table.add_column("Base URL", style="dim")
-    for pid in ADAPTER_SPECS.keys():
-        p = providers.get(pid, {}) if isinstance(providers.get(pid), dict) else {}
+    for pid in _ADAPTER_IDS:
+        p = _get_as(providers, pid, dict)
         key = str(p.get("apiKey", "") or "")
         masked = "已配置" if key else "未配置"
         table.add_row(
@@ -724,7 +887,16 @@ def _render_adapter_status():
             str(p.get("cooldownSeconds", 60)),
             str(p.get("baseUrl", "") or ""),
         )
-    console.print(table)
+    return [
+        "",
+        f"[bold]配置文件:[/] {DEFAULT_SEARCH_ADAPTERS_PATH}",
+        f"[bold]当前激活扩展源:[/] {active or '(未激活)'}",
+        f"[bold]主搜索源:[/] {primary or '(未设置)'}",
+        f"[bold]备用链:[/] {' -> '.join(fallbacks) if fallbacks else '(未设置)'}",
+        f"[bold]统一主源(官方+扩展):[/] {primary_source or '(未设置)'}",
+        f"[bold]统一备用链(官方+扩展):[/] {' -> '.join(fallback_sources) if fallback_sources else '(未设置)'}",
+        table,
+    ]
 
 
 def _configure_adapter_provider(provider_id: str):
@@ -733,179 +905,164 @@ def _configure_adapter_provider(provider_id: str):
         console.print("\n[bold red]❌ 无效 provider[/]")
         pause_enter()
         return
+    header = title_panel(f"🔍 扩展搜索源配置: {provider_id}")
+    spec = ADAPTER_SPECS.get(provider_id, {})
+    env_keys = spec.get("envKeys", [])
+    frame = MenuFrame(console)
     while True:
-        console.clear()
-        console.print(Panel(
-            Text(f"🔍 扩展搜索源配置: {provider_id}", style="bold cyan", justify="center"),
-            box=box.DOUBLE
-        ))
-        cfg = load_search_adapters()
+        cfg = _cached_load_search_adapters()
         p = cfg.get("providers", {}).get(provider_id, {})
-        spec = ADAPTER_SPECS.get(provider_id, {})
-        env_keys = spec.get("envKeys", [])
-        console.print()
-        console.print(f"[bold]标签:[/] {spec.get('label', provider_id)}")
-        console.print(f"[bold]启用:[/] {'是' if p.get('enabled') else '否'}")
-        console.print(f"[bold]API Key:[/] {'已配置' if p.get('apiKey') else '未配置'}")
-        console.print(f"[bold]Base URL:[/] {p.get('baseUrl', '')}")
-        console.print(f"[bold]TopK:[/] {p.get('topK', 5)}")
-        console.print(f"[bold]冷却秒数:[/] {p.get('cooldownSeconds', 60)}")
+        rows = [
+            header,
+            "",
+            f"[bold]标签:[/] {spec.get('label', provider_id)}",
+            f"[bold]启用:[/] {'是' if p.get('enabled') else '否'}",
+            f"[bold]API Key:[/] {'已配置' if p.get('apiKey') else '未配置'}",
+            f"[bold]Base URL:[/] {p.get('baseUrl', '')}",
+            f"[bold]TopK:[/] {p.get('topK', 5)}",
+            f"[bold]冷却秒数:[/] {p.get('cooldownSeconds', 60)}",
+        ]
         if env_keys:
-            console.print(f"[dim]环境变量候选: {', '.join(env_keys)}[/]")
-        console.print()
-        console.print("[bold]操作:[/]")
-        console.print("  [cyan]1[/] 切换启用状态")
-        console.print("  [cyan]2[/] 设置 API Key")
-        console.print("  [cyan]3[/] 设置 Base URL")
-        console.print("  [cyan]4[/] 设置 TopK")
-        console.print("  [cyan]5[/] 设置冷却秒数 (限流后跳过)")
-        console.print("  [cyan]6[/] 连接测试")
-        console.print("  [cyan]7[/] 清空此扩展源配置")
-        console.print("  [cyan]0[/] 返回")
-        console.print()
+            rows.append(f"[dim]环境变量候选: {', '.join(env_keys)}[/]")
+        rows.append(_ADAPTER_PROVIDER_ACTIONS)
+        frame.draw(*rows)
         choice = Prompt.ask("[bold green]>[/]", choices=["0", "1", "2", "3", "4", "5", "6", "7"], default="0")
         if choice == "0":
             return
-        if choice == "1":
-            ok = update_search_adapter_provider(provider_id, {"enabled": not bool(p.get("enabled"))})
-            console.print("\n[green]✅ 已更新[/]" if ok else "\n[bold red]❌ 更新失败[/]")
-            pause_enter()
-        elif choice == "2":
-            key = getpass.getpass(f"请输入 {provider_id} API Key (输入不会显示): ").strip()
-            if not key:
-                console.print("\n[bold red]❌ 未输入 Key[/]")
+        with frame.away():
+            if choice == "1":
+                ok = update_search_adapter_provider(provider_id, {"enabled": not bool(p.get("enabled"))})
+                _invalidate_search_adapters_cache()
+                console.print("\n[green]✅ 已更新[/]" if ok else "\n[bold red]❌ 更新失败[/]")
                 pause_enter()
-                continue
-            ok = update_search_adapter_provider(provider_id, {"apiKey": key})
-            console.print("\n[green]✅ 已写入 API Key[/]" if ok else "\n[bold red]❌ 写入失败[/]")
-            pause_enter()
-        elif choice == "3":
-            base = Prompt.ask("[bold]请输入 Base URL[/]", default=str(p.get("baseUrl", "") or "")).strip()
-            ok = update_search_adapter_provider(provider_id, {"baseUrl": base})
-            console.print("\n[green]✅ 已更新 Base URL[/]" if ok else "\n[bold red]❌ 更新失败[/]")
-            pause_enter()
-        elif choice == "4":
-            top_k_raw = Prompt.ask("[bold]请输入 TopK (1-20)[/]", default=str(p.get("topK", 5))).strip()
-            try:
-                top_k = int(top_k_raw)
-            except Exception:
-                console.print("\n[bold red]❌ TopK 必须是整数[/]")
+            elif choice == "2":
+                key = getpass.getpass(f"请输入 {provider_id} API Key (输入不会显示): ").strip()
+                if not key:
+                    console.print("\n[bold red]❌ 未输入 Key[/]")
+                    pause_enter()
+                    continue
+                ok = update_search_adapter_provider(provider_id, {"apiKey": key})
+                _invalidate_search_adapters_cache()
+                console.print("\n[green]✅ 已写入 API Key[/]" if ok else "\n[bold red]❌ 写入失败[/]")
                 pause_enter()
-                continue
-            ok = update_search_adapter_provider(provider_id, {"topK": top_k})
-            console.print("\n[green]✅ 已更新 TopK[/]" if ok else "\n[bold red]❌ 更新失败[/]")
-            pause_enter()
-        elif choice == "5":
-            raw = Prompt.ask("[bold]请输入冷却秒数(5-3600)[/]", default=str(p.get("cooldownSeconds", 60))).strip()
-            try:
-                cooldown = int(raw)
-            except Exception:
-                console.print("\n[bold red]❌ 必须是整数[/]")
+            elif choice == "3":
+                base = Prompt.ask("[bold]请输入 Base URL[/]", default=str(p.get("baseUrl", "") or "")).strip()
+                ok = update_search_adapter_provider(provider_id, {"baseUrl": base})
+                _invalidate_search_adapters_cache()
+                console.print("\n[green]✅ 已更新 Base URL[/]" if ok else "\n[bold red]❌ 更新失败[/]")
+                pause_enter()
+            elif choice == "4":
+                top_k_raw = Prompt.ask("[bold]请输入 TopK (1-20)[/]", default=str(p.get("topK", 5))).strip()
+                try:
+                    top_k = int(top_k_raw)
+                except Exception:
+                    console.print("\n[bold red]❌ TopK 必须是整数[/]")
+                    pause_enter()
+                    continue
+                ok = update_search_adapter_provider(provider_id, {"topK": top_k})
+                _invalidate_search_adapters_cache()
+                console.print("\n[green]✅ 已更新 TopK[/]" if ok else "\n[bold red]❌ 更新失败[/]")
+                pause_enter()
+            elif choice == "5":
+                raw = Prompt.ask("[bold]请输入冷却秒数(5-3600)[/]", default=str(p.get("cooldownSeconds", 60))).strip()
+                try:
+                    cooldown = int(raw)
+                except Exception:
+                    console.print("\n[bold red]❌ 必须是整数[/]")
+                    pause_enter()
+                    continue
+                ok = update_search_adapter_provider(provider_id, {"cooldownSeconds": cooldown})
+                _invalidate_search_adapters_cache()
+                console.print("\n[green]✅ 已更新冷却秒数[/]" if ok else "\n[bold red]❌ 更新失败[/]")
+                pause_enter()
+            elif choice == "6":
+                ok, msg = test_search_adapter_connection(provider_id)
+                if ok:
+                    console.print(f"\n[green]✅ 连通测试成功: {msg}[/]")
+                else:
+                    console.print(f"\n[bold red]❌ 连通测试失败: {msg}[/]")
+                pause_enter()
+            elif choice == "7":
+                if not Confirm.ask(f"[bold red]确认清空 {provider_id} 扩展源配置？[/]", default=False):
+                    continue
+                reset = {
+                    "enabled": False,
+                    "apiKey": "",
+                    "baseUrl": ADAPTER_SPECS.get(provider_id, {}).get("defaultBaseUrl", ""),
+                    "model": "",
+                    "topK": 5,
+                    "cooldownSeconds": 60,
+                }
+                ok = update_search_adapter_provider(provider_id, reset)
+                _invalidate_search_adapters_cache()
+                console.print("\n[green]✅ 已清空扩展源配置[/]" if ok else "\n[bold red]❌ 清空失败[/]")
                 pause_enter()
-                continue
-            ok = update_search_adapter_provider(provider_id, {"cooldownSeconds": cooldown})
-            console.print("\n[green]✅ 已更新冷却秒数[/]" if ok else "\n[bold red]❌ 更新失败[/]")
-            pause_enter()
-        elif choice == "6":
-            ok, msg = test_search_adapter_connection(provider_id)
-            if ok:
-                console.print(f"\n[green]✅ 连通测试成功: {msg}[/]")
-            else:
-                console.print(f"\n[bold red]❌ 连通测试失败: {msg}[/]")
-            pause_enter()
-        elif choice == "7":
-            if not Confirm.ask(f"[bold red]确认清空 {provider_id} 扩展源配置？[/]", default=False):
-                continue
-            reset = {
-                "enabled": False,
-                "apiKey": "",
-                "baseUrl": ADAPTER_SPECS.get(provider_id, {}).get("defaultBaseUrl", ""),
-                "model": "",
-                "topK": 5,
-                "cooldownSeconds": 60,
-            }
-            ok = update_search_adapter_provider(provider_id, reset)
-            console.print("\n[green]✅ 已清空扩展源配置[/]" if ok else "\n[bold red]❌ 清空失败[/]")
-            pause_enter()
 
 
 def menu_thirdparty_search():
     """扩展搜索源配置（智谱/Serper/Tavily）"""
+    frame = MenuFrame(console)
     while True:
-        console.clear()
-        console.print(Panel(
-            Text("🔍 扩展搜索源 (智谱/Serper/Tavily)", style="bold cyan", justify="center"),
-            box=box.DOUBLE
-        ))
-
-        _render_adapter_status()
-        console.print()
-        console.print("[bold]操作:[/]")
-        console.print("  [cyan]1[/] 配置 zhipu")
-        console.print("  [cyan]2[/] 配置 serper")
-        console.print("  [cyan]3[/] 配置 tavily")
-        console.print("  [cyan]4[/] 设置激活扩展源")
-        console.print("  [cyan]5[/] 测试激活扩展源连接")
-        console.print("  [cyan]0[/] 返回")
-        console.print()
+        frame.draw(
+            _HEADER_THIRDPARTY_SEARCH,
+            *_adapter_status_renderables(),
+            _THIRDPARTY_SEARCH_ACTIONS,
+        )
         choice = Prompt.ask("[bold green]>[/]", choices=["0", "1", "2", "3", "4", "5"], default="0")
         if choice == "0":
             break
-        elif choice == "1":
-            _run_menu_action(lambda: _configure_adapter_provider("zhipu"), "配置 zhipu")
-        elif choice == "2":
-            _run_menu_action(lambda: _configure_adapter_provider("serper"), "配置 serper")
-        elif choice == "3":
-            _run_menu_action(lambda: _configure_adapter_provider("tavily"), "配置 tavily")
-        elif choice == "4":
-            console.print()
-            console.print("[dim]可输入: 1=zhipu, 2=serper, 3=tavily，或直接输入名称；留空清除[/]")
-            raw = Prompt.ask("[bold]请输入主搜索源[/]", default="").strip()
-            target = _resolve_adapter_provider_input(raw) if raw else ""
-            ok = set_primary_provider(target)
-            if ok:
-                console.print(f"\n[green]✅ 已设置主搜索源: {target or '(未设置)'}[/]")
-            else:
-                console.print("\n[bold red]❌ 设置失败：请输入 zhipu/serper/tavily 或 1/2/3[/]")
-            pause_enter()
-        elif choice == "5":
-            cfg = load_search_adapters()
-            active = str(cfg.get("active", "") or "")
-            if not active:
-                console.print("\n[yellow]⚠️ 当前没有激活扩展源[/]")
+        # 配置子菜单自行清屏；设置主源与连通测试在菜单下方直接提示
+        with frame.away(keep_menu=choice in ("4", "5")):
+            if choice == "1":
+                _run_menu_action(lambda: _configure_adapter_provider("zhipu"), "配置 zhipu")
+            elif choice == "2":
+                _run_menu_action(lambda: _configure_adapter_provider("serper"), "配置 serper")
+            elif choice == "3":
+                _run_menu_action(lambda: _configure_adapter_provider("tavily"), "配置 tavily")
+            elif choice == "4":
+                console.print()
+                console.print("[dim]可输入: 1=zhipu, 2=serper, 3=tavily，或直接输入名称；留空清除[/]")
+                raw = Prompt.ask("[bold]请输入主搜索源[/]", default="").strip()
+                target = _resolve_adapter_provider_input(raw) if raw else ""
+                ok = set_primary_provider(target)
+                _invalidate_search_adapters_cache()
+                if ok:
+                    console.print(f"\n[green]✅ 已设置主搜索源: {target or '(未设置)'}[/]")
+                else:
+                    console.print("\n[bold red]❌ 设置失败：请输入 zhipu/serper/tavily 或 1/2/3[/]")
+                pause_enter()
+            elif choice == "5":
+                cfg = _cached_load_search_adapters()
+                active = str(cfg.get("active", "") or "")
+                if not active:
+                    console.print("\n[yellow]⚠️ 当前没有激活扩展源[/]")
+                    pause_enter()
+                    continue
+                ok, msg = test_search_adapter_connection(active)
+                if ok:
+                    console.print(f"\n[green]✅ {active} 连通测试成功: {msg}[/]")
+                else:
+                    console.print(f"\n[bold red]❌ {active} 连通测试失败: {msg}[/]")
                 pause_enter()
-                continue
-            ok, msg = test_search_adapter_connection(active)
-            if ok:
-                console.print(f"\n[green]✅ {active} 连通测试成功: {msg}[/]")
-            else:
-                console.print(f"\n[bold red]❌ {active} 连通测试失败: {msg}[/]")
-            pause_enter()
 
 
 def select_default_search_provider_enhanced():
     """选择默认搜索 provider（增强版）"""
+    # provider 列表会话内已缓存，选项区只需构建一次
+    providers = get_official_search_providers()
+    choices = ["0"] + [str(i) for i in range(1, len(providers) + 1)]
+    options = static_text(
+        "",
+        "[bold]选项:[/]",
+        *(f"  [cyan]{i}[/] {provider}" for i, provider in enumerate(providers, 1)),
+        "  [cyan]0[/] 返回",
+        "",
+    )
     while True:
         console.clear()
-        console.print(Panel(
-            Text("选择默认搜索服务", style="bold cyan", justify="center"),
-            box=box.DOUBLE
-        ))
-        
-        providers = get_official_search_providers()
+        render_screen(console, _HEADER_SELECT_DEFAULT_SEARCH, options)
         
-        console.print()
-        console.print("[bold]选项:[/]")
-        for i, provider in enumerate(providers, 1):
-            console.print(f"  [cyan]{i}[/] {provider}")
-        
-        console.print("  [cyan]0[/] 返回")
-        console.print()
-        
-        choices = ["0"] + [str(i) for i in range(1, len(providers) + 1)]
         choice = Prompt.ask("[bold green]>[/]", choices=choices, default="0").strip().lower()
-        while choice not in choices:
-            choice = Prompt.ask("[bold green]>[/]", choices=choices, default="0").strip().lower()
         
         if choice == "0":
             break
@@ -926,32 +1083,30 @@ def activate_configured_search_provider():
     """仅展示已配置 API Key 的官方搜索 provider，并激活其为默认。"""
     while True:
         console.clear()
-        console.print(Panel(
-            Text("激活已配置 Key 的搜索服务", style="bold cyan", justify="center"),
-            box=box.DOUBLE
-        ))
 
         providers = get_official_search_providers()
         configured = list_configured_official_search_providers(providers)
 
         if not configured:
-            console.print("\n[yellow]未检测到已配置 API Key 的官方搜索服务。[/]")
-            console.print("[dim]可在“官方搜索服务配置”中写入 key 或配置 .env。[/]")
+            render_screen(
+                console,
+                _HEADER_ACTIVATE_SEARCH,
+                "",
+                "[yellow]未检测到已配置 API Key 的官方搜索服务。[/]",
+                "[dim]可在“官方搜索服务配置”中写入 key 或配置 .env。[/]",
+            )
             pause_enter()
             return
 
-        console.print()
-        console.print("[bold]可激活服务:[/]")
+        rows = [_HEADER_ACTIVATE_SEARCH, "", "[bold]可激活服务:[/]"]
         for i, provider in enumerate(configured, 1):
             label = OFFICIAL_SEARCH_SPECS.get(provider, {}).get("label", provider)
-            console.print(f"  [cyan]{i}[/] {provider} [dim]({label})[/]")
-        console.print("  [cyan]0[/] 返回")
-        console.print()
+            rows.append(f"  [cyan]{i}[/] {provider} [dim]({label})[/]")
+        rows += ["  [cyan]0[/] 返回", ""]
+        render_screen(console, *rows)
 
         choices = ["0"] + [str(i) for i in range(1, len(configured) + 1)]
         choice = Prompt.ask("[bold green]>[/]", choices=choices, default="0").strip().lower()
-        while choice not in choices:
-            choice = Prompt.ask("[bold green]>[/]", choices=choices, default="0").strip().lower()
 
         if choice == "0":
             return
@@ -967,15 +1122,16 @@ def activate_configured_search_provider():
         return
 
 
-def _show_memory_provider_key_status(active_provider: str):
-    console.print("\n[bold]向量 Provider 凭据状态 (models.providers.*.apiKey):[/]")
+def _memory_provider_key_status_lines(active_provider: str) -> List[str]:
+    lines = ["", "[bold]向量 Provider 凭据状态 (models.providers.*.apiKey):[/]"]
     active = str(active_provider or "auto").strip().lower() or "auto"
     for provider in OFFICIAL_MEMORY_PROVIDERS:
         target = get_memory_provider_credential_target(provider) or provider
         has_key = has_memory_provider_api_key(provider)
         mark = "✅" if has_key else "⬜"
         star = "⭐" if active == provider else "  "
-        console.print(f"  {star} {mark} {provider}  -> models.providers.{target}.apiKey")
+        lines.append(f"  {star} {mark} {provider}  -> models.providers.{target}.apiKey")
+    return lines
 
 
 def _prompt_memory_provider_key(provider: str) -> bool:
@@ -1040,29 +1196,18 @@ def menu_embeddings():
     provider_map = {"2": "openai", "3": "gemini", "4": "voyage", "5": "mistral"}
     while True:
         console.clear()
-        console.print(Panel(
-            Text("🔍 向量化/记忆检索配置", style="bold cyan", justify="center"),
-            box=box.DOUBLE
-        ))
 
         ms = get_memory_search_config()
         provider = str(ms.get("provider", "auto") or "auto")
 
-        console.print()
-        console.print(f"[bold]当前向量 provider:[/] {provider}")
-        _show_memory_provider_key_status(provider)
-
-        console.print()
-        console.print("[bold]选项:[/]")
-        console.print("  [cyan]1[/] Auto (按已配置 Provider 凭据自动选择)")
-        console.print("  [cyan]2[/] OpenAI")
-        console.print("  [cyan]3[/] Gemini")
-        console.print("  [cyan]4[/] Voyage")
-        console.print("  [cyan]5[/] Mistral")
-        console.print("  [cyan]6[/] 管理向量 Provider 凭据")
-        console.print("  [cyan]V[/] 查看索引验证命令")
-        console.print("  [cyan]0[/] 返回")
-        console.print()
+        render_screen(
+            console,
+            _HEADER_EMBEDDINGS,
+            "",
+            f"[bold]当前向量 provider:[/] {provider}",
+            *_memory_provider_key_status_lines(provider),
+            _EMBEDDINGS_OPTIONS,
+        )
 
         choice = Prompt.ask(
             "[bold green]>[/]",
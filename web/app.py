@@ -571,10 +571,10 @@ def _set_agent_access_policy(agent_id: str, access_mode: str, capability_preset:
         agent_id=agent_id,
         workspace_path=workspace,
         model_primary=model_primary,
-        model_fallbacks_csv=",".join(model_fallbacks),
+        model_fallbacks=model_fallbacks,
         allow_agents=allow_agents,
         sub_model_primary=sub_model_primary,
-        sub_model_fallbacks_csv=",".join(sub_model_fallbacks),
+        sub_model_fallbacks=sub_model_fallbacks,
         access_mode=access_mode,
         capability_preset=capability_preset,
         control_plane_capabilities=access["controlPlaneCapabilities"],
@@ -600,10 +600,10 @@ def _set_agent_permission_policy(agent_id: str, permission_overrides: Optional[D
         agent_id=agent_id,
         workspace_path=workspace,
         model_primary=model_primary,
-        model_fallbacks_csv=",".join(model_fallbacks),
+        model_fallbacks=model_fallbacks,
         allow_agents=allow_agents,
         sub_model_primary=sub_model_primary,
-        sub_model_fallbacks_csv=",".join(sub_model_fallbacks),
+        sub_model_fallbacks=sub_model_fallbacks,
         access_mode=access["accessMode"],
         capability_preset=access["capabilityPreset"],
         control_plane_capabilities=access["controlPlaneCapabilities"],
@@ -845,7 +845,7 @@ def _state_payload(force: bool = False, include_usage: bool = False) -> Dict[str
     search_cfg = config.data.get("tools", {}).get("web", {}).get("search", {})
     search_provider = str(search_cfg.get("provider", "") or "")
     official_supported = get_official_search_providers()
-    official_configured = list_configured_official_search_providers(official_supported)
+    official_configured = list_configured_official_search_providers(official_supported, config_data=config.data)
     adapter_cfg = load_search_adapters()
 
     defaults_sub = config.data.get("agents", {}).get("defaults", {}).get("subagents", {}) or {}
@@ -1371,10 +1371,10 @@ async def bind_workspace_api(body: BindWorkspaceIn):
         agent_id=body.agentId,
         workspace_path=body.workspace,
         model_primary=model_primary,
-        model_fallbacks_csv=",".join(model_fallbacks),
+        model_fallbacks=model_fallbacks,
         allow_agents=allow_agents,
         sub_model_primary=sub_model_primary,
-        sub_model_fallbacks_csv=",".join(sub_model_fallbacks),
+        sub_model_fallbacks=sub_model_fallbacks,
         access_mode=access["accessMode"],
         capability_preset=access["capabilityPreset"],
         control_plane_capabilities=access["controlPlaneCapabilities"],
@@ -1421,7 +1421,7 @@ async def set_agent_permission_policy_api(body: AgentPermissionPolicyIn):
 async def set_control_whitelist_api(body: ControlWhitelistIn):
     caps = [x.strip() for x in (body.capabilities or []) if x and x.strip()]
     if body.enabled and not caps:
-        caps = list(RECOMMENDED_CONTROL_PLANE_CAPABILITIES)
+        caps = RECOMMENDED_CONTROL_PLANE_CAPABILITIES
     ok = set_agent_control_plane_whitelist(body.agentId, body.enabled, caps)
     if not ok:
         raise HTTPException(status_code=400, detail="更新命令白名单失败")